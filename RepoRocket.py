@@ -1,27 +1,50 @@
 import sys
 import os
-import requests
 import zipfile
 import json
 import pygame
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QLineEdit, QStackedWidget, QWidget, QScrollArea, QComboBox,
-    QGridLayout, QMenu, QFileDialog, QCheckBox, QProgressBar, QDialog, QListWidget, QListWidgetItem, QSplitter, QMessageBox
+    QGridLayout, QMenu, QFileDialog, QCheckBox, QProgressBar, QDialog, QListWidget, QListWidgetItem, QSplitter, QMessageBox,
+    QListView
 )
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QEvent, QPoint, QUrl
-from PyQt6.QtGui import QPixmap, QIcon, QAction, QPainter, QBrush, QFontDatabase, QKeyEvent
+from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QEvent, QUrl, QThreadPool, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QPixmap, QIcon, QAction, QFontDatabase, QKeyEvent, QImageReader
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 import shutil
 import traceback
+from urllib.parse import quote
 from steamgrid import SteamGridDB, StyleType, MimeType, ImageType
 import qdarkstyle
 import yaml
 import importlib.util
+from collections import OrderedDict, namedtuple
+from workers import Worker
+from http_cache import ResponseCache
+from http_client import HttpClient
+from rate_limit import INTERACTIVE, BACKGROUND
+from repo_index import RepoIndex
+from downloader import SegmentedDownloader
+from checksums import find_checksum_file, parse_provider_digest
+from extractor import StreamingExtractor
+from content_store import ContentStore, remove_tree
+from delta_update import DeltaUpdater
+from asset_cache import AssetCache
+from update_checker import UpdateChecker, match_asset
+from library_view import LibraryModel, LibraryDelegate, TILE_SIZE
+from thumbnail_cache import ThumbnailCache, placeholder, read_scaled
+from library_index import LibraryIndex
+from download_manager import DownloadManager, QUEUED, RUNNING, PAUSED, COMPLETED, FAILED, CANCELLED
 
 # Initialize SteamGridDB with your API key
 sgdb = SteamGridDB('40f20195948fb2489554d4c9e5ee8ef9')
 
+# Release assets are kept as small tuples rather than the provider's full JSON.
+# digests maps hashlib names to hex digests published by the provider;
+# checksums_url points at a SHA256SUMS-style asset of the same release.
+ReleaseAsset = namedtuple("ReleaseAsset", ["name", "url", "digests", "checksums_url"], defaults=(None, None))
+
 class RepoRocket(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -33,7 +56,45 @@ class RepoRocket(QMainWindow):
         self.error_log_path = os.path.join("saves", "reporocket", "errorlogs.json")
         self.themes_path = os.path.join("themes")
         self.plugins_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+        # Network work runs on this pool so the UI thread never blocks on a request
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(8)
+        self.search_generation = 0
+        self.search_sources = ["GitHub", "GitLab", "Internet Archive"]
+        self.search_workers = []
+        self.search_state = None
+        self.search_loading_label = None
+        self.search_page_size = 30
+        self.release_page_size = 30
+        self.details_generation = 0
+        self.release_next_cursor = None
+        self.artwork_page_generation = 0
+        # Results already fetched this session, keyed by (source, normalized query)
+        self.search_results_cache = OrderedDict()
         self.create_folder_structure()
+        # Every request goes through one pooled session backed by the response cache
+        self.http = HttpClient(cache=ResponseCache(os.path.join("saves", "reporocket", "http_cache.sqlite3")))
+        # Everything search has ever returned, for instant and offline lookups
+        self.repo_index = RepoIndex(os.path.join("saves", "reporocket", "repo_index.sqlite3"))
+        self.downloader = SegmentedDownloader(self.http)
+        # Installed files are deduplicated across apps and versions
+        self.content_store = ContentStore(os.path.join("saves", "reporocket", "store"))
+        self.delta_updater = DeltaUpdater(self.downloader, self.content_store)
+        # Installed archives are kept here for reinstalls and rollbacks
+        self.asset_cache = AssetCache(os.path.join("saves", "reporocket", "assets"))
+        # Downloads run in the background and survive restarts
+        self.download_manager = DownloadManager(
+            self.downloader, self.install_download, os.path.join("saves", "reporocket", "downloads.json"),
+            update=self.update_download, cache=self.asset_cache, parent=self
+        )
+        self.download_rows = {}
+        # Installed apps with a newer release, filled in by check_for_updates()
+        self.update_checker = UpdateChecker(self.http)
+        self.available_updates = {}
+        self.update_check_running = False
+        # What is installed, kept current by a filesystem watcher so the library never rescans
+        self.library_index = LibraryIndex(os.path.join("saves", "reporocket", "library.sqlite3"), "applications",
+                                          os.path.join("saves", "reporocket", "artwork"), parent=self)
         self.init_ui()
         self.status_bar = self.statusBar()
         self.progress_bar = QProgressBar()
@@ -42,6 +103,25 @@ class RepoRocket(QMainWindow):
         self.load_config()
         self.load_settings()
         self.load_plugins()
+        self.library_index.sync(self.config)
+        self.library_index.apps_changed.connect(self.update_library_page)
+        self.library_index.app_changed.connect(self.on_library_app_changed)
+        self.library_index.start()
+        self.download_manager.job_changed.connect(self.on_download_job_changed)
+        self.download_manager.job_progress.connect(self.update_download_row)
+        self.download_manager.job_completed.connect(self.on_download_completed)
+        self.download_manager.job_failed.connect(self.on_download_failed)
+        self.download_manager.update_failed.connect(self.on_delta_update_failed)
+        self.download_manager.progress_changed.connect(self.update_download_progress)
+        # Pick up whatever was still queued when RepoRocket last closed
+        self.download_manager.schedule()
+        self.update_download_progress()
+        # Check the library for new releases now and every hour
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(60 * 60 * 1000)
+        self.update_timer.timeout.connect(self.check_for_updates)
+        self.update_timer.start()
+        QTimer.singleShot(0, self.check_for_updates)
 
         # Initialize pygame and gamepad in a separate thread to avoid blocking the UI
         QTimer.singleShot(0, self.init_gamepad_async)
@@ -76,6 +156,7 @@ class RepoRocket(QMainWindow):
         # Add buttons to the sidebar
         self.add_button("Search", self.show_search_page)
         self.add_button("Library", self.show_library_page)
+        self.add_button("Downloads", self.show_downloads_page)
         self.add_button("Settings", self.show_settings_page)
 
         # Main content area
@@ -83,10 +164,12 @@ class RepoRocket(QMainWindow):
         self.search_page = self.create_search_page()
         self.repo_detail_page = self.create_repo_detail_page()
         self.library_page = self.create_library_page()
+        self.downloads_page = self.create_downloads_page()
         self.settings_page = self.create_settings_page()
         self.main_content.addWidget(self.search_page)
         self.main_content.addWidget(self.repo_detail_page)
         self.main_content.addWidget(self.library_page)
+        self.main_content.addWidget(self.downloads_page)
         self.main_content.addWidget(self.settings_page)
 
         # Add widgets to layout
@@ -147,92 +230,403 @@ class RepoRocket(QMainWindow):
         page = QWidget()
         layout = QVBoxLayout()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Search repositories...")
-        search_bar.setStyleSheet("font-size: 18px; padding: 10px; font-family: Arial;")
-        search_bar.returnPressed.connect(lambda: self.perform_search(search_bar.text()))
-        layout.addWidget(search_bar)
+        self.search_bar = QLineEdit()
+        self.search_bar.setPlaceholderText("Search repositories...")
+        self.search_bar.setStyleSheet("font-size: 18px; padding: 10px; font-family: Arial;")
+        self.search_bar.returnPressed.connect(self.submit_search)
+        self.search_bar.textChanged.connect(self.on_search_text_changed)
+        layout.addWidget(self.search_bar)
+
+        # Live search waits for a pause in typing before hitting the API
+        self.search_debounce = QTimer(self)
+        self.search_debounce.setSingleShot(True)
+        self.search_debounce.setInterval(400)
+        self.search_debounce.timeout.connect(lambda: self.perform_search(self.search_bar.text()))
 
         self.repo_selector = QComboBox()
-        self.repo_selector.addItems(["GitHub", "GitLab", "Internet Archive"])
+        self.repo_selector.addItems(self.search_sources + ["All Sources"])
         self.repo_selector.setStyleSheet("font-size: 18px; padding: 10px; font-family: Arial;")
-        self.repo_selector.currentIndexChanged.connect(lambda: self.perform_search(search_bar.text()))
+        self.repo_selector.currentIndexChanged.connect(lambda: self.perform_search(self.search_bar.text()))
         layout.addWidget(self.repo_selector)
 
         self.results_area = QScrollArea()
         self.results_area.setWidgetResizable(True)
         self.results_widget = QWidget()
         self.results_layout = QVBoxLayout()
+        self.results_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.results_widget.setLayout(self.results_layout)
         self.results_area.setWidget(self.results_widget)
+        # Further pages are loaded as the list nears the bottom
+        self.results_area.verticalScrollBar().valueChanged.connect(self.on_results_scrolled)
+        self.results_area.verticalScrollBar().rangeChanged.connect(lambda: self.on_results_scrolled(self.results_area.verticalScrollBar().value()))
         layout.addWidget(self.results_area)
 
         page.setLayout(layout)
         return page
 
+    def get_selected_sources(self, selection):
+        return list(self.search_sources) if selection == "All Sources" else [selection]
+
+    def clear_search_results(self):
+        self.search_loading_label = None
+        while self.results_layout.count():
+            item = self.results_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+    def submit_search(self):
+        self.search_debounce.stop()
+        self.perform_search(self.search_bar.text())
+
+    def on_search_text_changed(self, text):
+        query = text.strip().lower()
+        if len(query) < 2:
+            self.search_debounce.stop()
+            return
+
+        # Show whatever we already know locally right away, then refine remotely
+        selection = self.repo_selector.currentText()
+        results = self.get_local_search_results(selection, query)
+        if results is not None:
+            self.render_search_results(selection, results)
+        self.search_debounce.start()
+
+    def get_local_search_results(self, selection, query):
+        # Exact hit, or the longest already fetched prefix filtered down locally
+        if (selection, query) in self.search_results_cache:
+            self.search_results_cache.move_to_end((selection, query))
+            return self.search_results_cache[(selection, query)]["results"]
+        for end in range(len(query) - 1, 0, -1):
+            entry = self.search_results_cache.get((selection, query[:end]))
+            if entry is not None:
+                return self.filter_repos_locally(entry["results"], query)
+        # Nothing fetched this session, fall back to the persistent index
+        return self.repo_index.search(query, self.get_selected_sources(selection)) or None
+
+    def filter_repos_locally(self, results, query):
+        terms = query.split()
+        matches = []
+        for source, repo in results:
+            repo_name, owner_name = self.get_repo_identity(source, repo)
+            haystack = f"{repo_name} {owner_name} {repo.get('description') or ''}".lower()
+            if all(term in haystack for term in terms):
+                matches.append((source, repo))
+        return matches
+
     def perform_search(self, query):
-        # Clear previous results
-        for i in reversed(range(self.results_layout.count())):
-            self.results_layout.itemAt(i).widget().deleteLater()
+        # Every new search makes whatever is still in flight stale
+        self.search_generation += 1
+        generation = self.search_generation
+        for worker in self.search_workers:
+            try:
+                taken = self.thread_pool.tryTake(worker)
+            except RuntimeError:
+                # The C++ side of a worker that has already run is gone
+                taken = False
+            if taken:
+                # Still queued, so nothing has been spent on it yet. A worker that is
+                # already running is left to finish: its result feeds the prefix cache
+                # but is never displayed.
+                worker.cancel()
+        self.search_workers = []
+        self.search_state = None
+
+        query = query.strip()
+        if not query:
+            self.clear_search_results()
+            return
 
-        # Fetch search results based on selected repository
-        try:
-            if self.repo_selector.currentText() == "GitHub":
-                api_url = f"https://api.github.com/search/repositories?q={query}"
-            elif self.repo_selector.currentText() == "GitLab":
-                api_url = f"https://gitlab.com/api/v4/projects?search={query}"
-            elif self.repo_selector.currentText() == "Internet Archive":
-                api_url = f"https://archive.org/advancedsearch.php?q={query}&fl[]=identifier,title,creator&output=json"
-            else:
-                raise Exception("Unsupported repository")
+        selection = self.repo_selector.currentText()
+        key = (selection, query.lower())
+        if key in self.search_results_cache:
+            self.search_results_cache.move_to_end(key)
+            self.start_search_session(generation, selection, query, self.search_results_cache[key])
+            return
 
-            response = requests.get(api_url)
-            if response.status_code == 200:
-                if self.repo_selector.currentText() == "GitHub":
-                    repos = response.json().get("items", [])
-                elif self.repo_selector.currentText() == "GitLab":
-                    repos = response.json()
-                elif self.repo_selector.currentText() == "Internet Archive":
-                    repos = response.json().get("response", {}).get("docs", [])
-                else:
-                    repos = []
-
-                for repo in repos[:10]:  # Limit to top 10 results
-                    if self.repo_selector.currentText() == "GitHub":
-                        repo_name = repo['name']
-                        owner_name = repo['owner']['login']
-                    elif self.repo_selector.currentText() == "GitLab":
-                        repo_name = repo['name']
-                        owner_name = repo['namespace']['name']
-                    elif self.repo_selector.currentText() == "Internet Archive":
-                        repo_name = repo['title']
-                        owner_name = repo['creator']
-
-                    button = QPushButton(f"{repo_name} by {owner_name}")
-                    button.setStyleSheet("""QPushButton {
-                        background-color: #2e2e2e;
-                        color: white;
-                        padding: 10px;
-                        text-align: left;
-                        font-size: 16px;
-                        font-family: Arial;
-                    }
-                    QPushButton:hover {
-                        background-color: #3e3e3e;
-                    }
-                    QPushButton:focus {
-                        background-color: #3e3e3e;
-                    }""")
-                    button.clicked.connect(lambda _, r=repo: self.show_repo_details(r))
-                    self.results_layout.addWidget(button)
-            else:
-                raise Exception("API error")
-        except Exception as e:
-            error_message = f"Error fetching results: {e}\n{traceback.format_exc()}"
-            self.log_error(error_message)
-            error_label = QLabel(f"Error fetching results: {e}")
-            error_label.setStyleSheet("color: red; font-size: 16px; font-family: Arial;")
-            self.results_layout.addWidget(error_label)
+        local_results = self.get_local_search_results(selection, query.lower())
+        if local_results is not None:
+            self.render_search_results(selection, local_results)
+        else:
+            self.clear_search_results()
+            searching_label = QLabel("Searching...")
+            searching_label.setStyleSheet("color: white; font-size: 16px; font-family: Arial;")
+            self.results_layout.addWidget(searching_label)
+
+        # Every selected provider is queried in parallel and merged as it answers
+        sources = self.get_selected_sources(selection)
+        entry = {
+            "results": [],
+            "ranked": [],
+            "seen_ids": set(),
+            "seen_names": {},
+            "pages": {source: 0 for source in sources},
+            "more": {source: True for source in sources},
+            "pending": set(sources),
+            "failed": False,
+        }
+        for source in sources:
+            worker = Worker(self.fetch_search_results, source, query, 1)
+            worker.signals.result.connect(lambda result, g=generation, sel=selection, q=query, e=entry, s=source: self.on_search_source_results(g, sel, q, e, s, result))
+            worker.signals.error.connect(lambda err, tb, g=generation, sel=selection, q=query, e=entry, s=source: self.on_search_source_error(g, sel, q, e, s, err, tb))
+            # Kept alive by search_workers rather than deleted by the pool once it has run
+            worker.setAutoDelete(False)
+            self.search_workers.append(worker)
+            self.thread_pool.start(worker)
+
+    def fetch_search_results(self, source, query, page=1, priority=INTERACTIVE):
+        # Runs on the thread pool, so it must not touch any widgets.
+        # Returns (repos, has_more) for the requested page.
+        per_page = self.search_page_size
+        # Encoded so "&", "#" or "+" in what was typed stay part of the query, and of its cache key
+        query = quote(query, safe="")
+        if source == "GitHub":
+            api_url = f"https://api.github.com/search/repositories?q={query}&page={page}&per_page={per_page}"
+        elif source == "GitLab":
+            api_url = f"https://gitlab.com/api/v4/projects?search={query}&page={page}&per_page={per_page}"
+        elif source == "Internet Archive":
+            api_url = f"https://archive.org/advancedsearch.php?q={query}&fl[]=identifier,title,creator&rows={per_page}&page={page}&output=json"
+        else:
+            raise Exception("Unsupported repository")
+
+        response = self.http.get_cached(api_url, priority=priority)
+        if response.status_code != 200:
+            raise Exception("API error")
+
+        if source == "GitHub":
+            repos = response.json().get("items", [])
+            has_more = "next" in response.links
+        elif source == "GitLab":
+            repos = response.json()
+            has_more = bool(response.headers.get("X-Next-Page"))
+        elif source == "Internet Archive":
+            result = response.json().get("response", {})
+            repos = result.get("docs", [])
+            has_more = page * per_page < result.get("numFound", 0)
+        self.index_repos(source, repos)
+        return repos, has_more
+
+    def index_repos(self, source, repos):
+        rows = []
+        for repo in repos:
+            repo_name, owner_name = self.get_repo_identity(source, repo)
+            if not isinstance(owner_name, str):
+                owner_name = ", ".join(owner_name)
+            rows.append((self.get_repo_id(source, repo), str(repo_name), owner_name, repo.get('description'), repo))
+        self.repo_index.add_repos(source, rows)
+
+    def get_repo_identity(self, source, repo):
+        # Returns (repo_name, owner_name) for a repo dict from the given source
+        if source == "GitHub":
+            return repo['name'], repo['owner']['login']
+        elif source == "GitLab":
+            return repo['name'], repo['namespace']['name']
+        elif source == "Internet Archive":
+            return repo['title'], repo.get('creator', 'Unknown')
+        raise Exception("Unsupported repository")
+
+    def get_repo_id(self, source, repo):
+        if source == "Internet Archive":
+            return repo['identifier']
+        return repo['id']
+
+    def merge_search_results(self, entry, source, page, repos, has_more, query):
+        """
+        Fold one provider page into a search entry. Returns (rank_key, (source, repo))
+        for every result not seen before; a project mirrored on several providers is
+        kept only once. With a query, results are ranked by how well the name
+        matches it, otherwise each provider's own order is kept.
+        """
+        entry["pages"][source] = page
+        entry["more"][source] = has_more
+        source_index = self.search_sources.index(source)
+        keyed = []
+        for position, repo in enumerate(repos, start=(page - 1) * self.search_page_size):
+            repo_name, owner_name = self.get_repo_identity(source, repo)
+            name_key = (str(repo_name).lower(), str(owner_name).lower())
+            repo_id = (source, self.get_repo_id(source, repo))
+            if repo_id in entry["seen_ids"] or entry["seen_names"].get(name_key, source) != source:
+                continue
+            entry["seen_ids"].add(repo_id)
+            entry["seen_names"][name_key] = source
+
+            score = 0
+            if query:
+                name = str(repo_name).lower()
+                if name == query:
+                    score = 3
+                elif name.startswith(query):
+                    score = 2
+                elif query in name:
+                    score = 1
+            keyed.append(((-score, position, source_index), (source, repo)))
+        return keyed
+
+    def on_search_source_results(self, generation, selection, query, entry, source, result):
+        repos, has_more = result
+        rank_query = query.lower() if len(entry["pages"]) > 1 else None
+        entry["ranked"].extend(self.merge_search_results(entry, source, 1, repos, has_more, rank_query))
+        entry["ranked"].sort(key=lambda keyed: keyed[0])
+        entry["results"] = [pair for _, pair in entry["ranked"]]
+        entry["pending"].discard(source)
+        if not entry["pending"] and not entry["failed"]:
+            self.search_results_cache[(selection, query.lower())] = entry
+            if len(self.search_results_cache) > 50:
+                self.search_results_cache.popitem(last=False)
+
+        if generation != self.search_generation:
+            return  # A newer search has replaced this one
+        if entry["pending"]:
+            # Stream early providers in, re-ranked as each one answers
+            self.render_search_results(selection, entry["results"])
+        else:
+            self.search_workers = []
+            self.start_search_session(generation, selection, query, entry)
+
+    def on_search_source_error(self, generation, selection, query, entry, source, e, error_traceback):
+        entry["more"][source] = False
+        entry["pending"].discard(source)
+        entry["failed"] = True
+        if generation != self.search_generation:
+            return
+        error_message = f"Error fetching results: {e}\n{error_traceback}"
+        self.log_error(error_message)
+        if entry["pending"]:
+            return
+        self.search_workers = []
+        if entry["results"]:
+            self.start_search_session(generation, selection, query, entry)
+            return
+
+        # Offline or failing: show what the local index knows, if anything
+        indexed = self.repo_index.search(query, self.get_selected_sources(selection))
+        self.render_search_results(selection, indexed)
+        error_label = QLabel(f"Error fetching results: {e}" + (" (showing saved results)" if indexed else ""))
+        error_label.setStyleSheet("color: red; font-size: 16px; font-family: Arial;")
+        self.results_layout.insertWidget(0, error_label)
+
+    def start_search_session(self, generation, selection, query, entry):
+        # entry is the cached search record and keeps growing as pages load
+        self.search_state = {
+            "generation": generation,
+            "selection": selection,
+            "query": query,
+            "entry": entry,
+            "prefetching": False,
+            "prefetched": None,
+            "waiting": False,
+        }
+        self.render_search_results(selection, entry["results"])
+        self.prefetch_next_search_page()
+
+    def prefetch_next_search_page(self):
+        state = self.search_state
+        if not state or state["prefetching"] or state["prefetched"] is not None:
+            return
+        entry = state["entry"]
+        sources = [source for source, more in entry["more"].items() if more]
+        if not sources:
+            return
+
+        # One round fetches the next page from every provider that still has one
+        generation = state["generation"]
+        state["prefetching"] = True
+        page_round = {"pending": set(sources), "pages": {}}
+        for source in sources:
+            page = entry["pages"][source] + 1
+            # Prefetching is background work and yields to interactive lookups
+            worker = Worker(self.fetch_search_results, source, state["query"], page, BACKGROUND)
+            worker.signals.result.connect(lambda result, g=generation, r=page_round, s=source, p=page: self.on_search_page_prefetched(g, r, s, p, result))
+            worker.signals.error.connect(lambda e, tb, g=generation, r=page_round, s=source, p=page: self.on_search_page_error(g, r, s, p, e, tb))
+            worker.setAutoDelete(False)
+            self.search_workers.append(worker)
+            self.thread_pool.start(worker)
+
+    def on_search_page_prefetched(self, generation, page_round, source, page, result):
+        if generation != self.search_generation or not self.search_state:
+            return
+        page_round["pages"][source] = (page, result)
+        page_round["pending"].discard(source)
+        if page_round["pending"]:
+            return
+        self.search_workers = []
+        self.search_state["prefetching"] = False
+        self.search_state["prefetched"] = page_round["pages"]
+        if self.search_state["waiting"]:
+            self.load_next_search_page()
+
+    def on_search_page_error(self, generation, page_round, source, page, e, error_traceback):
+        self.log_error(f"Error fetching more results: {e}\n{error_traceback}")
+        # Treat the provider as exhausted so the round can still complete
+        self.on_search_page_prefetched(generation, page_round, source, page - 1, ([], False))
+
+    def on_results_scrolled(self, value):
+        scroll_bar = self.results_area.verticalScrollBar()
+        if self.search_state and value >= scroll_bar.maximum() - 200:
+            self.load_next_search_page()
+
+    def load_next_search_page(self):
+        state = self.search_state
+        if not state:
+            return
+        entry = state["entry"]
+        if state["prefetched"] is None:
+            if not any(entry["more"].values()) or state["waiting"]:
+                return
+            # Show the page as soon as its prefetch lands
+            state["waiting"] = True
+            self.search_loading_label = QLabel("Loading more results...")
+            self.search_loading_label.setStyleSheet("color: white; font-size: 16px; font-family: Arial;")
+            self.results_layout.addWidget(self.search_loading_label)
+            self.prefetch_next_search_page()
+            return
+
+        rank_query = state["query"].lower() if len(entry["pages"]) > 1 else None
+        keyed = []
+        for source, (page, (repos, has_more)) in state["prefetched"].items():
+            keyed.extend(self.merge_search_results(entry, source, page, repos, has_more, rank_query))
+        keyed.sort(key=lambda item: item[0])
+        state["prefetched"] = None
+        state["waiting"] = False
+
+        self.remove_search_loading_label()
+        for _, (source, repo) in keyed:
+            entry["results"].append((source, repo))
+            self.results_layout.addWidget(self.create_search_result_button(state["selection"], source, repo))
+        self.prefetch_next_search_page()
+
+    def remove_search_loading_label(self):
+        if self.search_loading_label is not None:
+            self.results_layout.removeWidget(self.search_loading_label)
+            self.search_loading_label.deleteLater()
+            self.search_loading_label = None
+
+    def render_search_results(self, selection, results):
+        self.clear_search_results()
+        for source, repo in results:
+            self.results_layout.addWidget(self.create_search_result_button(selection, source, repo))
+
+    def create_search_result_button(self, selection, source, repo):
+        repo_name, owner_name = self.get_repo_identity(source, repo)
+        label = f"{repo_name} by {owner_name}"
+        if selection == "All Sources":
+            label += f"  [{source}]"
+        button = QPushButton(label)
+        button.setStyleSheet("""QPushButton {
+            background-color: #2e2e2e;
+            color: white;
+            padding: 10px;
+            text-align: left;
+            font-size: 16px;
+            font-family: Arial;
+        }
+        QPushButton:hover {
+            background-color: #3e3e3e;
+        }
+        QPushButton:focus {
+            background-color: #3e3e3e;
+        }""")
+        button.clicked.connect(lambda _, r=repo, s=source: self.show_repo_details(r, s))
+        return button
 
     def create_repo_detail_page(self):
         page = QWidget()
@@ -296,119 +690,325 @@ class RepoRocket(QMainWindow):
         page.setLayout(layout)
         return page
 
-    def show_repo_details(self, repo):
+    def show_repo_details(self, repo, source=None):
+        # Results remember their provider, so "All Sources" and later selector changes still work
         self.current_repo = repo
-        if self.repo_selector.currentText() == "GitHub":
-            owner = repo['owner']['login']
-            repo_name = repo['name']
-        elif self.repo_selector.currentText() == "GitLab":
-            owner = repo['namespace']['name']
-            repo_name = repo['name']
-        elif self.repo_selector.currentText() == "Internet Archive":
-            owner = repo['creator']
-            repo_name = repo['title']
+        self.current_source = source or self.repo_selector.currentText()
+        repo_name, owner = self.get_repo_identity(self.current_source, repo)
 
         self.repo_title.setText(repo_name)
-        self.repo_description.setText(repo.get('description', 'No description available.'))
+        self.repo_description.setText(repo.get('description') or 'No description available.')
 
-        # Fetch releases
+        # Releases load in the background, newest page first
+        self.details_generation += 1
+        self.release_next_cursor = None
+        self.release_selector.blockSignals(True)
         self.release_selector.clear()
-        try:
-            if self.repo_selector.currentText() == "GitHub":
-                api_url = f"https://api.github.com/repos/{owner}/{repo_name}/releases"
-            elif self.repo_selector.currentText() == "GitLab":
-                api_url = f"https://gitlab.com/api/v4/projects/{repo['id']}/releases"
-            elif self.repo_selector.currentText() == "Internet Archive":
-                api_url = f"https://archive.org/metadata/{repo['identifier']}"
-
-            response = requests.get(api_url)
-            if response.status_code == 200:
-                if self.repo_selector.currentText() == "GitHub":
-                    releases = response.json()
-                elif self.repo_selector.currentText() == "GitLab":
-                    releases = response.json()
-                elif self.repo_selector.currentText() == "Internet Archive":
-                    releases = response.json().get("files", [])
-
-                for release in releases:
-                    if self.repo_selector.currentText() == "GitHub":
-                        self.release_selector.addItem(release['tag_name'], release['assets'])
-                    elif self.repo_selector.currentText() == "GitLab":
-                        self.release_selector.addItem(release['tag_name'], release['assets'])
-                    elif self.repo_selector.currentText() == "Internet Archive":
-                        if release['format'] not in ["Metadata", "Text", "Item Image"]:
-                            self.release_selector.addItem(release['name'], release['name'])
-
-                if not releases:
-                    self.release_selector.addItem("No releases available", None)
-            else:
-                self.release_selector.addItem("Error fetching releases", None)
-        except Exception as e:
-            self.release_selector.addItem(f"Error: {e}", None)
+        self.release_selector.addItem("Loading releases...", None)
+        self.release_selector.blockSignals(False)
+        self.file_selector.clear()
+        self.request_release_page(self.get_releases_url(self.current_source, repo))
 
         self.main_content.setCurrentWidget(self.repo_detail_page)
 
+    def get_releases_url(self, source, repo):
+        repo_name, owner = self.get_repo_identity(source, repo)
+        per_page = self.release_page_size
+        if source == "GitHub":
+            return f"https://api.github.com/repos/{owner}/{repo_name}/releases?per_page={per_page}"
+        elif source == "GitLab":
+            return f"https://gitlab.com/api/v4/projects/{repo['id']}/releases?per_page={per_page}"
+        elif source == "Internet Archive":
+            return f"https://archive.org/metadata/{repo['identifier']}"
+        raise Exception("Unsupported repository")
+
+    def request_release_page(self, cursor):
+        generation = self.details_generation
+        worker = Worker(self.fetch_release_page, self.current_source, self.current_repo, cursor)
+        worker.signals.result.connect(lambda result, g=generation: self.display_release_page(g, result))
+        worker.signals.error.connect(lambda e, tb, g=generation: self.display_release_error(g, e, tb))
+        self.thread_pool.start(worker)
+
+    def fetch_release_page(self, source, repo, cursor):
+        """
+        Runs on the thread pool. `cursor` is the page URL for GitHub/GitLab (taken
+        from the Link header of the previous page) or (url, offset) into the
+        Internet Archive file list. Returns ([(tag, assets)], next_cursor), where
+        assets is a tuple of ReleaseAsset.
+        """
+        if source == "Internet Archive":
+            url, offset = cursor if isinstance(cursor, tuple) else (cursor, 0)
+        else:
+            url = cursor
+        response = self.http.get_cached(url)
+        if response.status_code != 200:
+            raise Exception("Error fetching releases")
+
+        releases = []
+        next_cursor = None
+        if source == "GitHub":
+            for release in response.json():
+                assets = tuple(
+                    ReleaseAsset(asset['name'], asset['browser_download_url'], parse_provider_digest(asset.get('digest')))
+                    for asset in release['assets']
+                )
+                releases.append((release['tag_name'], self.link_checksum_files(assets)))
+            next_cursor = response.links.get("next", {}).get("url")
+        elif source == "GitLab":
+            for release in response.json():
+                assets = release.get('assets', {})
+                links = [ReleaseAsset(link['name'], link.get('direct_asset_url') or link['url']) for link in assets.get('links', [])]
+                sources = [ReleaseAsset(f"Source code ({archive['format']})", archive['url']) for archive in assets.get('sources', [])]
+                releases.append((release['tag_name'], self.link_checksum_files(tuple(links + sources))))
+            next_cursor = response.links.get("next", {}).get("url")
+        elif source == "Internet Archive":
+            # One metadata document lists every file; it is paged locally from the cache
+            files = [f for f in response.json().get("files", []) if f.get('format') not in ["Metadata", "Text", "Item Image"]]
+            for f in files[offset:offset + self.release_page_size]:
+                download_url = f"https://archive.org/download/{repo['identifier']}/{f['name']}"
+                digests = {algorithm: f[algorithm] for algorithm in ("sha1", "md5") if f.get(algorithm)}
+                releases.append((f['name'], (ReleaseAsset(f['name'], download_url, digests),)))
+            if offset + self.release_page_size < len(files):
+                next_cursor = (url, offset + self.release_page_size)
+
+        if cursor == self.get_releases_url(source, repo):
+            # Remember the newest releases so the library can work offline
+            self.repo_index.record_releases(source, self.get_repo_id(source, repo), [tag for tag, _ in releases])
+        return releases, next_cursor
+
+    def link_checksum_files(self, assets):
+        # Point each asset at the checksum file published alongside it, if any
+        urls = {asset.name: asset.url for asset in assets}
+        linked = []
+        for asset in assets:
+            checksum_file = find_checksum_file(asset.name, urls)
+            linked.append(asset._replace(checksums_url=urls[checksum_file]) if checksum_file else asset)
+        return tuple(linked)
+
+    def display_release_page(self, generation, result):
+        if generation != self.details_generation:
+            return  # The user has moved on to another repo
+        releases, next_cursor = result
+        first_page = self.release_next_cursor is None and self.release_selector.itemData(0) is None
+
+        self.release_selector.blockSignals(True)
+        # Drop the "Loading..." / "Load older releases" placeholder at the end
+        self.release_selector.removeItem(self.release_selector.count() - 1)
+        first_new_index = self.release_selector.count()
+        for tag, assets in releases:
+            self.release_selector.addItem(tag, assets)
+        if first_page and not releases:
+            self.release_selector.addItem("No releases available", None)
+        self.release_next_cursor = next_cursor
+        if next_cursor:
+            self.release_selector.addItem("Load older releases...", "more")
+        self.release_selector.setCurrentIndex(0 if first_page else min(first_new_index, self.release_selector.count() - 1))
+        self.release_selector.blockSignals(False)
+        self.populate_files()
+
+    def display_release_error(self, generation, e, error_traceback):
+        if generation != self.details_generation:
+            return
+        self.log_error(f"Error fetching releases: {e}\n{error_traceback}")
+        self.release_selector.blockSignals(True)
+        self.release_selector.removeItem(self.release_selector.count() - 1)
+        self.release_selector.addItem(f"Error: {e}", None)
+        self.release_selector.blockSignals(False)
+
     def populate_files(self):
         self.file_selector.clear()
         assets = self.release_selector.currentData()
-        if assets:
-            if self.repo_selector.currentText() in ["GitHub", "GitLab"]:
-                for asset in assets:
-                    self.file_selector.addItem(asset['name'], asset['browser_download_url'])
-            elif self.repo_selector.currentText() == "Internet Archive":
-                for asset in assets:
-                    self.file_selector.addItem(asset, f"https://archive.org/download/{self.current_repo['identifier']}/{asset}")
+        if assets == "more":
+            # Older releases are only fetched when asked for
+            index = self.release_selector.currentIndex()
+            self.release_selector.blockSignals(True)
+            self.release_selector.setItemText(index, "Loading older releases...")
+            self.release_selector.setItemData(index, None)
+            self.release_selector.blockSignals(False)
+            self.request_release_page(self.release_next_cursor)
+        elif assets:
+            for asset in assets:
+                self.file_selector.addItem(asset.name, asset)
 
     def download_selected_file(self):
-        selected_url = self.file_selector.currentData()
-        if not selected_url:
+        asset = self.file_selector.currentData()
+        if not asset:
             self.repo_description.setText("No valid file selected.")
             return
 
         try:
-            repo_name = self.current_repo['name'] if self.repo_selector.currentText() != "Internet Archive" else self.current_repo['title']
-            self.download_file(selected_url, repo_name)
+            repo_name = self.current_repo['name'] if self.current_source != "Internet Archive" else self.current_repo['title']
+            self.download_file(asset.url, repo_name, asset, self.get_origin(self.current_source, self.current_repo,
+                                                                            self.release_selector.currentText()))
         except Exception as e:
             error_message = f"Error during download: {e}\n{traceback.format_exc()}"
             self.log_error(error_message)
             self.repo_description.setText(f"Error during download: {e}")
-            self.progress_bar.setVisible(False)
 
-    def download_file(self, url, repo_name):
-        response = requests.get(url, stream=True)
-        file_name = url.split("/")[-1]
-        # Create double folder: applications/app_name/app_name
-        parent_folder = os.path.join("applications", repo_name)
-        child_folder = os.path.join(parent_folder, repo_name)
-        os.makedirs(child_folder, exist_ok=True)
-        save_path = os.path.join(child_folder, file_name)
-        
-        total_size = int(response.headers.get('content-length', 0))
-        self.progress_bar.setMaximum(total_size)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setVisible(True)
+    def get_origin(self, source, repo, release):
+        # Where an install came from, kept in config.json for update checks
+        origin = {"provider": source, "repo_id": self.get_repo_id(source, repo), "release": release}
+        if source == "GitHub":
+            origin["repo"] = repo['full_name'] if 'full_name' in repo else f"{repo['owner']['login']}/{repo['name']}"
+        return origin
 
-        with open(save_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-                    self.progress_bar.setValue(self.progress_bar.value() + len(chunk))
+    def download_file(self, url, repo_name, asset=None, origin=None, replaces=None):
+        file_name = url.split("/")[-1]
+        # Kept out of applications/ so a queued, failed or cancelled download never shows up as an app
+        download_folder = os.path.join("saves", "reporocket", "downloads", repo_name)
+        os.makedirs(download_folder, exist_ok=True)
+        save_path = os.path.join(download_folder, file_name)
+
+        info = {}
+        if asset is not None:
+            # Lets the download be verified as it streams in
+            info = {"asset": asset.name, "digests": asset.digests or {}, "checksums_url": asset.checksums_url}
+        if origin is not None:
+            info["origin"] = origin
+        if replaces and file_name.lower().endswith(".zip") and self.content_store.manifest(repo_name):
+            # An update of the installed asset `replaces`: try fetching only the members that changed
+            info["replaces"] = replaces
+        job = self.download_manager.add(url, save_path, repo_name, info=info)
+        self.status_bar.showMessage(f"Queued {file_name}", 5000)
+        return job
+
+    def install_download(self, job, source, progress, stop_event):
+        # Runs next to the download, `source` fills in as the file arrives. The double
+        # folder applications/app_name/app_name is only created once something is installed
+        extract_path = os.path.join("applications", job.repo_name, job.repo_name)
+        extractor = StreamingExtractor(source, extract_path, self.http, job.url, progress, stop_event,
+                                       store=self.content_store, app=job.repo_name,
+                                       asset=job.info.get("asset", job.file_name))
+        if extractor.run():
+            # The archive goes to the asset cache once the job completes
+            return "extracted"
+        # Not an archive, the verified file itself is what gets installed
+        os.makedirs(extract_path, exist_ok=True)
+        target = os.path.join(extract_path, job.file_name)
+        if job.path.endswith(".html"):
+            shutil.move(source.path, target)
+            job.path = target
+            return "html"
+        # A copy: the download, or the cached file it came from, stays in the asset cache
+        shutil.copy2(source.path, target)
+        return "file"
+
+    def update_download(self, job, progress, install_progress, stop_event):
+        # Runs on the download pool; None falls back to a full download
+        update = self.delta_updater.prepare(job.url, job.repo_name, job.info["replaces"], job.path + ".delta")
+        if update is None:
+            return None
+        self.delta_updater.fetch(update, progress, stop_event)
+        job.phase = "Installing"
+        extract_path = os.path.join("applications", job.repo_name, job.repo_name)
+        return self.delta_updater.install(update, extract_path, job.repo_name, job.info.get("asset", job.file_name),
+                                          install_progress, stop_event)
+
+    def on_download_completed(self, job_id):
+        job = self.download_manager.jobs[job_id]
+        self.status_bar.showMessage(f"Finished {job.file_name}", 5000)
+        if job.result in ("extracted", "file") and job.sha256 and os.path.exists(job.path):
+            self.asset_cache.add(job.path, job.url, job.sha256, job.validator)
+            try:
+                os.rmdir(os.path.dirname(job.path))
+            except OSError:
+                # Other downloads for the same app are still in there
+                pass
+        if job.info.get("origin") and job.result in ("extracted", "file"):
+            self.record_origin(job.repo_name, job.info["origin"], job.info.get("asset"))
+        # Picks up the new size, the library repaints through the index signals
+        self.library_index.refresh(job.repo_name)
 
-        self.progress_bar.setVisible(False)
+    def record_origin(self, app_name, origin, asset_name):
+        self.config.setdefault(app_name, {}).update(origin, asset=asset_name)
+        self.save_config()
+        self.library_index.update(app_name, provider=origin["provider"], repo_id=origin["repo_id"], release=origin["release"])
+        update = self.available_updates.get(app_name)
+        if update and update["release"] == origin["release"]:
+            del self.available_updates[app_name]
 
-        if zipfile.is_zipfile(save_path):
-            self.repo_description.setText("Extracting files...")
-            self.progress_bar.setVisible(True)
-            self.unzip_and_clean(save_path, repo_name)
+    def check_for_updates(self):
+        if self.update_check_running:
+            return
+        installed = {app_name: entry for app_name, entry in self.config.items()
+                     if isinstance(entry, dict) and entry.get("provider") and os.path.isdir(os.path.join("applications", app_name))}
+        if not installed:
+            return
+        self.update_check_running = True
+        worker = Worker(self.update_checker.check, installed)
+        worker.signals.result.connect(self.on_updates_checked)
+        worker.signals.error.connect(lambda e, tb: self.log_error(f"Error checking for updates: {e}\n{tb}"))
+        worker.signals.finished.connect(lambda: setattr(self, "update_check_running", False))
+        self.thread_pool.start(worker)
+
+    def on_updates_checked(self, updates):
+        self.available_updates = updates
+        if updates:
+            self.status_bar.showMessage(f"{len(updates)} update{'s' if len(updates) != 1 else ''} available", 5000)
+        self.library_model.set_updates(updates)
+
+    def update_application(self, app_name):
+        entry = self.config.get(app_name, {})
+        update = self.available_updates.get(app_name)
+        if not update:
+            return
+        assets = self.link_checksum_files(tuple(ReleaseAsset(name, url, digests) for name, url, digests in update["assets"]))
+        names = {asset.name: asset for asset in assets}
+        asset_name = match_asset(entry.get("asset") or "", entry.get("release"), update["release"], names)
+        if asset_name is None:
+            QMessageBox.information(self, "Update", f"Pick the file to install from {app_name} {update['release']} in Search.")
+            return
+        origin = {key: entry[key] for key in ("provider", "repo_id", "repo") if key in entry}
+        origin["release"] = update["release"]
+        self.download_file(names[asset_name].url, app_name, names[asset_name], origin, replaces=entry.get("asset"))
+
+    def on_download_failed(self, job_id):
+        job = self.download_manager.jobs[job_id]
+        self.log_error(f"Error downloading {job.url}: {job.error}")
+        self.status_bar.showMessage(f"Download failed: {job.file_name}", 5000)
+
+    def on_delta_update_failed(self, job_id, e, error_traceback):
+        job = self.download_manager.jobs[job_id]
+        self.log_error(f"Error patching {job.repo_name} from {job.url}, downloading it in full: {e}\n{error_traceback}")
+
+    def update_download_progress(self):
+        done, total, count, speed = self.download_manager.aggregate_progress()
+        if not count:
             self.progress_bar.setVisible(False)
-            self.repo_description.setText(f"Downloaded and extracted to {child_folder}")
-            self.prompt_for_executable(repo_name)
-        elif file_name.endswith(".html"):
-            self.repo_description.setText(f"Downloaded HTML file to {child_folder}")
-            self.display_html_content(save_path)
+            return
+        # Progress is tracked in tenths of a percent so multi-GB files fit the bar's int range
+        self.progress_bar.setMaximum(1000)
+        self.progress_bar.setValue(done * 1000 // total if total else 0)
+        details = f"{count} download{'s' if count != 1 else ''}"
+        if speed:
+            details += f", {self.format_speed(speed)}"
+            if total:
+                details += f", {self.format_eta((total - done) / speed)} left"
+        self.progress_bar.setFormat(f"%p% ({details})")
+        self.progress_bar.setVisible(True)
+
+    def format_speed(self, speed):
+        if speed >= 1048576:
+            return f"{speed / 1048576:.1f} MB/s"
+        return f"{speed / 1024:.0f} KB/s"
+
+    def format_size(self, size):
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024 or unit == "GB":
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+
+    def format_eta(self, seconds):
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+    def open_download(self, job_id):
+        job = self.download_manager.jobs[job_id]
+        if job.result == "html":
+            self.display_html_content(job.path)
         else:
-            self.repo_description.setText(f"Downloaded to {child_folder}")
-            self.prompt_for_executable(repo_name)
+            self.prompt_for_executable(job.repo_name)
 
     def display_html_content(self, html_path):
         self.html_viewer = QWebEngineView()
@@ -416,28 +1016,6 @@ class RepoRocket(QMainWindow):
         self.main_content.addWidget(self.html_viewer)
         self.main_content.setCurrentWidget(self.html_viewer)
 
-    def unzip_and_clean(self, zip_path, repo_name):
-        # Extract into the double folder: applications/app_name/app_name
-        extract_path = os.path.join("applications", repo_name, repo_name)
-        os.makedirs(extract_path, exist_ok=True)
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            total_files = len(zip_ref.infolist())
-            self.progress_bar.setMaximum(total_files)
-            self.progress_bar.setValue(0)
-            for i, file in enumerate(zip_ref.infolist()):
-                zip_ref.extract(file, extract_path)
-                self.progress_bar.setValue(i + 1)
-        os.remove(zip_path)
-
-        # Ensure no nested folders
-        for root, dirs, files in os.walk(extract_path):
-            if len(dirs) == 1 and not files:
-                nested_folder = os.path.join(root, dirs[0])
-                for item in os.listdir(nested_folder):
-                    shutil.move(os.path.join(nested_folder, item), os.path.join(extract_path, item))
-                os.rmdir(nested_folder)
-                break
-
     def prompt_for_executable(self, repo_name):
         self.executable_selector = QWidget()
         layout = QVBoxLayout()
@@ -446,6 +1024,26 @@ class RepoRocket(QMainWindow):
         label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
         layout.addWidget(label)
 
+        app = self.library_index.get(repo_name)
+        if app:
+            details = [repo_name]
+            if app["provider"]:
+                details.append(f"{app['release']} from {app['provider']}" if app["release"] else app["provider"])
+            if app["size"] is not None:
+                details.append(self.format_size(app["size"]))
+            # What search and the details page last saw of the repo, read without going online
+            seen = self.repo_index.get(app["provider"], app["repo_id"]) if app["provider"] and app["repo_id"] else None
+            if seen and seen["releases"] and app["provider"] != "Internet Archive" and seen["releases"][0] != app["release"]:
+                details.append(f"newest seen: {seen['releases'][0]}")
+            details_label = QLabel(" \u00b7 ".join(details))
+            details_label.setStyleSheet("font-size: 14px; font-family: Arial; color: #9e9e9e;")
+            layout.addWidget(details_label)
+            if seen and seen["description"]:
+                description_label = QLabel(seen["description"])
+                description_label.setWordWrap(True)
+                description_label.setStyleSheet("font-size: 14px; font-family: Arial; color: white;")
+                layout.addWidget(description_label)
+
         list_widget = QListWidget()
         list_widget.setStyleSheet("""
             QListWidget {
@@ -482,7 +1080,9 @@ class RepoRocket(QMainWindow):
         self.main_content.setCurrentWidget(self.executable_selector)
 
     def set_executable(self, repo_name, executable_path):
-        self.config[repo_name] = {"executable": executable_path}
+        # Keep the install origin and cloud save location recorded next to it
+        self.config.setdefault(repo_name, {})["executable"] = executable_path
+        self.library_index.update(repo_name, executable=executable_path)
         self.save_config()
         self.main_content.setCurrentWidget(self.search_page)
 
@@ -492,116 +1092,223 @@ class RepoRocket(QMainWindow):
     def show_library_page(self):
         self.main_content.setCurrentWidget(self.library_page)
         self.update_library_page()
+        # Catch up on resizes that happened while another page was showing
+        self.relayout_library()
 
     def show_settings_page(self):
         self.main_content.setCurrentWidget(self.settings_page)
 
-    def create_library_page(self):
+    def show_downloads_page(self):
+        self.main_content.setCurrentWidget(self.downloads_page)
+
+    def create_downloads_page(self):
         page = QWidget()
         layout = QVBoxLayout()
 
-        self.library_scroll_area = QScrollArea()
-        self.library_scroll_area.setWidgetResizable(True)
-        self.library_widget = QWidget()
-        self.library_layout = QGridLayout()
-        self.library_widget.setLayout(self.library_layout)
-        self.library_scroll_area.setWidget(self.library_widget)
-        layout.addWidget(self.library_scroll_area)
+        header_layout = QHBoxLayout()
+        downloads_label = QLabel("Downloads")
+        downloads_label.setStyleSheet("font-size: 24px; font-family: Arial; color: white;")
+        header_layout.addWidget(downloads_label)
+        header_layout.addStretch()
+        clear_button = QPushButton("Clear Finished")
+        clear_button.setStyleSheet("font-size: 16px; font-family: Arial; color: white; background-color: #2e2e2e; padding: 5px;")
+        clear_button.clicked.connect(self.clear_finished_downloads)
+        header_layout.addWidget(clear_button)
+        layout.addLayout(header_layout)
+
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        downloads_widget = QWidget()
+        self.downloads_layout = QVBoxLayout()
+        self.downloads_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        downloads_widget.setLayout(self.downloads_layout)
+        scroll_area.setWidget(downloads_widget)
+        layout.addWidget(scroll_area)
 
         page.setLayout(layout)
-        self.main_content.addWidget(page)
-        self.resizeEvent = self.update_library_page_on_resize
+        for job in self.download_manager.ordered_jobs():
+            self.update_download_row(job.id)
         return page
 
-    def update_library_page_on_resize(self, event):
-        self.update_library_page()
-        super().resizeEvent(event)
-
-    def update_library_page(self):
-        # Clear previous library items
-        for i in reversed(range(self.library_layout.count())):
-            self.library_layout.itemAt(i).widget().deleteLater()
-
-        # Calculate the number of columns based on the window width
-        window_width = self.library_scroll_area.width()
-        tile_width = 430  # Width of each tile
-        num_columns = max(1, window_width // tile_width)
-
-        # List downloaded applications
-        apps_dir = "applications"
-        if os.path.exists(apps_dir) and os.listdir(apps_dir):
-            row, col = 0, 0
-            for app_name in os.listdir(apps_dir):
-                app_path = os.path.join(apps_dir, app_name)
-                if os.path.isdir(app_path):
-                    tile = self.create_app_tile(app_name)
-                    self.library_layout.addWidget(tile, row, col)
-                    col += 1
-                    if col >= num_columns:
-                        col = 0
-                        row += 1
+    def create_download_row(self, job_id):
+        row = QWidget()
+        row.setStyleSheet("background-color: #2e2e2e; border-radius: 5px;")
+        row_layout = QHBoxLayout()
+
+        info_layout = QVBoxLayout()
+        row.label = QLabel()
+        row.label.setStyleSheet("font-size: 16px; font-family: Arial; color: white;")
+        info_layout.addWidget(row.label)
+        row.progress = QProgressBar()
+        row.progress.setMaximum(1000)
+        info_layout.addWidget(row.progress)
+        row_layout.addLayout(info_layout, 1)
+
+        button_style = "font-size: 14px; font-family: Arial; color: white; background-color: #3e3e3e; padding: 5px;"
+        row.up_button = QPushButton("▲")
+        row.up_button.clicked.connect(lambda: self.download_manager.change_priority(job_id, 1))
+        row.down_button = QPushButton("▼")
+        row.down_button.clicked.connect(lambda: self.download_manager.change_priority(job_id, -1))
+        row.pause_button = QPushButton()
+        row.pause_button.clicked.connect(lambda: self.toggle_download(job_id))
+        row.cancel_button = QPushButton("Cancel")
+        row.cancel_button.clicked.connect(lambda: self.download_manager.cancel(job_id))
+        row.open_button = QPushButton("Open")
+        row.open_button.clicked.connect(lambda: self.open_download(job_id))
+        row.remove_button = QPushButton("Remove")
+        row.remove_button.clicked.connect(lambda: self.download_manager.remove(job_id))
+        for button in (row.up_button, row.down_button, row.pause_button, row.cancel_button, row.open_button, row.remove_button):
+            button.setStyleSheet(button_style)
+            row_layout.addWidget(button)
+
+        row.setLayout(row_layout)
+        return row
+
+    def update_download_row(self, job_id):
+        job = self.download_manager.jobs.get(job_id)
+        row = self.download_rows.get(job_id)
+        if job is None:
+            if row is not None:
+                self.download_rows.pop(job_id)
+                row.deleteLater()
+            return
+        if row is None:
+            row = self.download_rows[job_id] = self.create_download_row(job_id)
+            self.downloads_layout.addWidget(row)
+
+        if job.state == RUNNING:
+            status = job.phase or "Downloading"
+        elif job.state == FAILED:
+            status = f"Failed: {job.error}"
         else:
-            empty_widget = QWidget()
-            empty_layout = QVBoxLayout()
-            empty_widget.setLayout(empty_layout)
-            empty_widget.setStyleSheet("""
-                QWidget {
-                    background-color: #2e2e2e;
-                    border-radius: 20px;
-                    padding: 20px;
-                }
-            """)
+            status = job.state.capitalize()
+        if job.total and job.state != COMPLETED and job.phase != "Installing":
+            status += f" - {job.done / 1048576:.1f} of {job.total / 1048576:.1f} MB"
+            if job.state == RUNNING and job.speed:
+                status += f" - {self.format_speed(job.speed)}"
+                if job.eta is not None:
+                    status += f", {self.format_eta(job.eta)} left"
+        row.label.setText(f"{job.repo_name} / {job.file_name}\n{status}")
+        row.progress.setValue(1000 if job.state == COMPLETED else job.done * 1000 // job.total if job.total else 0)
+
+        active = job.state in (QUEUED, RUNNING, PAUSED)
+        row.pause_button.setText("Pause" if job.state in (QUEUED, RUNNING) else "Resume")
+        row.pause_button.setVisible(active or job.state == FAILED)
+        row.up_button.setVisible(active)
+        row.down_button.setVisible(active)
+        row.cancel_button.setVisible(active or job.state == FAILED)
+        row.open_button.setVisible(job.state == COMPLETED)
+        row.remove_button.setVisible(job.state in (COMPLETED, CANCELLED))
+
+    def on_download_job_changed(self, job_id):
+        # State or priority changed: refresh the row and keep the list in queue order
+        self.update_download_row(job_id)
+        self.sort_download_rows()
+
+    def sort_download_rows(self):
+        for index, job in enumerate(self.download_manager.ordered_jobs()):
+            row = self.download_rows.get(job.id)
+            if row is not None and self.downloads_layout.indexOf(row) != index:
+                self.downloads_layout.insertWidget(index, row)
+
+    def toggle_download(self, job_id):
+        job = self.download_manager.jobs[job_id]
+        if job.state in (QUEUED, RUNNING):
+            self.download_manager.pause(job_id)
+        else:
+            self.download_manager.resume(job_id)
 
-            empty_label = QLabel("Library is Empty. Download something from the Search tab.")
-            empty_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_layout.addWidget(empty_label)
+    def clear_finished_downloads(self):
+        for job in list(self.download_manager.jobs.values()):
+            if job.state in (COMPLETED, CANCELLED):
+                self.download_manager.remove(job.id)
 
-            self.library_layout.addWidget(empty_widget, 0, 0, 1, num_columns, Qt.AlignmentFlag.AlignCenter)
+    def create_library_page(self):
+        page = QWidget()
+        layout = QVBoxLayout()
 
-    def create_app_tile(self, app_name):
-        button = QPushButton()
-        button.setFixedSize(430, 200)  # Aspect ratio 2.14:1
-        button.setStyleSheet("""
-            QPushButton {
-                border-radius: 20px;
+        # Tiles are painted by a delegate, only the ones in view
+        self.library_model = LibraryModel(os.path.join("saves", "reporocket", "artwork"), self)
+        self.library_view = QListView()
+        self.library_view.setModel(self.library_model)
+        self.thumbnail_cache = ThumbnailCache(os.path.join("saves", "reporocket", "thumbnails"))
+        self.library_delegate = LibraryDelegate(self.thumbnail_cache, self.library_view)
+        self.library_view.setItemDelegate(self.library_delegate)
+        self.library_view.verticalScrollBar().valueChanged.connect(self.library_delegate.prune)
+        self.library_view.setViewMode(QListView.ViewMode.IconMode)
+        self.library_view.setMovement(QListView.Movement.Static)
+        # Reflowed by relayout_library() once a resize settles, not on every resize event
+        self.library_view.setResizeMode(QListView.ResizeMode.Fixed)
+        self.library_view.setUniformItemSizes(True)
+        self.library_view.setSpacing(5)
+        self.library_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.library_view.setMouseTracking(True)
+        self.library_view.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.library_view.clicked.connect(lambda index: self.launch_app(index.data()))
+        self.library_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.library_view.customContextMenuRequested.connect(self.on_library_context_menu)
+        layout.addWidget(self.library_view)
+
+        self.library_empty_widget = QWidget()
+        empty_layout = QVBoxLayout()
+        self.library_empty_widget.setLayout(empty_layout)
+        self.library_empty_widget.setStyleSheet("""
+            QWidget {
                 background-color: #2e2e2e;
-                color: white;
-                font-size: 16px;
-                font-family: Arial;
-                text-align: center;
-            }
-            QPushButton:focus {
-                background-color: #3e3e3e;
-                border: 2px solid white;  # Add white border when focused
+                border-radius: 20px;
+                padding: 20px;
             }
         """)
+        empty_label = QLabel("Library is Empty. Download something from the Search tab.")
+        empty_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
+        empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        empty_layout.addWidget(empty_label)
+        self.library_empty_widget.setVisible(False)
+        layout.addWidget(self.library_empty_widget, 0, Qt.AlignmentFlag.AlignCenter)
+
+        self.library_columns = None
+        self.library_relayout_timer = QTimer(self)
+        self.library_relayout_timer.setSingleShot(True)
+        self.library_relayout_timer.setInterval(100)
+        self.library_relayout_timer.timeout.connect(self.relayout_library)
 
-        # Load artwork if available
-        artwork_path = os.path.join("saves", "reporocket", "artwork", f"{app_name}.png")
-        if os.path.exists(artwork_path):
-            pixmap = QPixmap(artwork_path).scaled(button.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-            mask = QPixmap(button.size())
-            mask.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(mask)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            painter.setBrush(QBrush(pixmap))
-            painter.drawRoundedRect(0, 0, button.width(), button.height(), 20, 20)
-            painter.end()
-            button.setIcon(QIcon(mask))
-            button.setIconSize(button.size())
-        else:
-            button.setText(app_name)
-
-        button.clicked.connect(lambda: self.launch_app(app_name))
-        button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        button.customContextMenuRequested.connect(lambda pos: self.show_context_menu(pos, app_name, button))
+        page.setLayout(layout)
+        self.main_content.addWidget(page)
+        return page
 
-        return button
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.main_content.currentWidget() is self.library_page:
+            # A drag-resize fires dozens of these, reflow once it settles
+            self.library_relayout_timer.start()
+
+    def relayout_library(self):
+        # Only the column count can change; tiles, artwork and the folder scan are left alone
+        spacing = self.library_view.spacing()
+        columns = max(1, self.library_view.viewport().width() // (TILE_SIZE.width() + 2 * spacing))
+        if columns != self.library_columns:
+            self.library_columns = columns
+            self.library_view.doItemsLayout()
 
-    def change_artwork(self, app_name, button):
+    def update_library_page(self):
+        # Straight from the index, artwork is loaded as tiles come into view
+        apps = self.library_index.apps()
+        self.library_model.set_apps(apps, self.library_index.artwork_keys())
+        self.library_model.set_updates(self.available_updates)
+        self.library_view.setVisible(bool(apps))
+        self.library_empty_widget.setVisible(not apps)
+
+    def on_library_app_changed(self, app_name):
+        app = self.library_index.get(app_name)
+        self.library_model.app_changed(app_name, app["artwork"] if app else None)
+
+    def on_library_context_menu(self, pos):
+        index = self.library_view.indexAt(pos)
+        if index.isValid():
+            self.show_context_menu(self.library_view.viewport().mapToGlobal(pos), index.data())
+
+    def change_artwork(self, app_name):
         self.current_app_name = app_name
-        self.artwork_button = button
         self.show_artwork_search_page()
 
     def show_artwork_search_page(self):
@@ -690,6 +1397,9 @@ class RepoRocket(QMainWindow):
 
     def load_artwork_page(self, game, page):
         self.current_page = page
+        # Images still loading for the previous page are dropped when they arrive
+        self.artwork_page_generation += 1
+        generation = self.artwork_page_generation
         for i in reversed(range(self.artwork_selection_layout.count())):
             self.artwork_selection_layout.itemAt(i).widget().deleteLater()
 
@@ -706,19 +1416,15 @@ class RepoRocket(QMainWindow):
                 grid_url = grid.url
                 button = QPushButton()
                 button.setFixedSize(460, 215)  # Adjusted size for better display
-                loading_icon = QPixmap("path/to/loading_icon.png")  # Replace with actual path to loading icon
-                button.setIcon(QIcon(loading_icon))
+                button.setIcon(QIcon(placeholder(button.size(), "Loading...")))
                 button.setIconSize(button.size())
                 self.artwork_selection_layout.addWidget(button, i // 6, i % 6)
 
-                def load_image(button, url):
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(requests.get(url).content)
-                    button.setIcon(QIcon(pixmap))
-                    button.setIconSize(button.size())
-                    button.clicked.connect(lambda _, url=url: self.download_and_apply_artwork(url))
-
-                QTimer.singleShot(0, lambda b=button, u=grid_url: load_image(b, u))
+                # Fetched and decoded at button size on the pool, the GUI thread only sets the icon
+                worker = Worker(self.fetch_artwork_image, grid_url, button.size())
+                worker.signals.result.connect(lambda image, b=button, u=grid_url, g=generation: self.show_artwork_image(g, b, u, image))
+                worker.signals.error.connect(lambda e, tb, b=button, g=generation: self.show_artwork_error(g, b, e, tb))
+                self.thread_pool.start(worker)
 
             self.prev_button.setEnabled(page > 0)
             self.next_button.setEnabled(end_index < len(grids_page))
@@ -729,9 +1435,33 @@ class RepoRocket(QMainWindow):
             error_label.setStyleSheet("color: red; font-size: 16px; font-family: Arial;")
             self.artwork_selection_layout.addWidget(error_label)
 
+    def fetch_artwork_image(self, url, size):
+        # Runs on the thread pool; QImage is safe off the GUI thread, QPixmap is not
+        response = self.http.get(url)
+        response.raise_for_status()
+        buffer = QBuffer()
+        buffer.setData(QByteArray(response.content))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        image = read_scaled(QImageReader(buffer), size, Qt.AspectRatioMode.KeepAspectRatio)
+        if image is None:
+            raise Exception("Unreadable image")
+        return image
+
+    def show_artwork_image(self, generation, button, url, image):
+        if generation != self.artwork_page_generation:
+            return  # The page has moved on and the button is gone
+        button.setIcon(QIcon(QPixmap.fromImage(image)))
+        button.clicked.connect(lambda _, url=url: self.download_and_apply_artwork(url))
+
+    def show_artwork_error(self, generation, button, e, error_traceback):
+        if generation != self.artwork_page_generation:
+            return
+        self.log_error(f"Error loading artwork: {e}\n{error_traceback}")
+        button.setIcon(QIcon(placeholder(button.size(), "Could not load image")))
+
     def download_and_apply_artwork(self, url):
         try:
-            response = requests.get(url, stream=True)
+            response = self.http.get(url, stream=True)
             if response.status_code == 200:
                 artwork_dir = os.path.join("saves", "reporocket", "artwork")
                 os.makedirs(artwork_dir, exist_ok=True)
@@ -740,17 +1470,8 @@ class RepoRocket(QMainWindow):
                     for chunk in response.iter_content(1024):
                         f.write(chunk)
 
-                # Update the button icon
-                pixmap = QPixmap(artwork_path).scaled(self.artwork_button.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-                mask = QPixmap(self.artwork_button.size())
-                mask.fill(Qt.GlobalColor.transparent)
-                painter = QPainter(mask)
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-                painter.setBrush(QBrush(pixmap))
-                painter.drawRoundedRect(0, 0, self.artwork_button.width(), self.artwork_button.height(), 20, 20)
-                painter.end()
-                self.artwork_button.setIcon(QIcon(mask))
-                self.artwork_button.setIconSize(self.artwork_button.size())
+                # The tile repaints with the new image
+                self.library_index.refresh_artwork(self.current_app_name)
 
                 # Go back to the library page
                 self.show_library_page()
@@ -764,6 +1485,7 @@ class RepoRocket(QMainWindow):
     def launch_app(self, app_name):
         executable_path = self.config.get(app_name, {}).get("executable")
         if executable_path and os.path.exists(executable_path):
+            self.library_index.record_launch(app_name)
             try:
                 os.startfile(executable_path)
             except OSError as e:
@@ -773,6 +1495,9 @@ class RepoRocket(QMainWindow):
                     self.prompt_for_executable(app_name)
                 else:
                     raise
+        else:
+            # Installed by a background download that has not been given an executable yet
+            self.prompt_for_executable(app_name)
 
     def create_settings_page(self):
         page = QWidget()
@@ -801,6 +1526,61 @@ class RepoRocket(QMainWindow):
         self.fullscreen_selector.currentIndexChanged.connect(self.toggle_fullscreen)
         layout.addWidget(self.fullscreen_selector)
 
+        # Optional personal access tokens raise the GitHub/GitLab API rate limits
+        token_label = QLabel("API Tokens")
+        token_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
+        layout.addWidget(token_label)
+
+        self.github_token_input = QLineEdit()
+        self.github_token_input.setPlaceholderText("GitHub personal access token (optional)")
+        self.github_token_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.github_token_input.setStyleSheet("font-size: 18px; font-family: Arial; padding: 10px;")
+        self.github_token_input.editingFinished.connect(self.change_api_tokens)
+        layout.addWidget(self.github_token_input)
+
+        self.gitlab_token_input = QLineEdit()
+        self.gitlab_token_input.setPlaceholderText("GitLab personal access token (optional)")
+        self.gitlab_token_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.gitlab_token_input.setStyleSheet("font-size: 18px; font-family: Arial; padding: 10px;")
+        self.gitlab_token_input.editingFinished.connect(self.change_api_tokens)
+        layout.addWidget(self.gitlab_token_input)
+
+        # Upper bound on parallel ranged connections per download
+        connections_label = QLabel("Download Connections")
+        connections_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
+        layout.addWidget(connections_label)
+
+        self.connections_selector = QComboBox()
+        self.connections_selector.addItems(["1", "2", "4", "8", "16"])
+        self.connections_selector.setCurrentText("4")
+        self.connections_selector.setStyleSheet("font-size: 18px; font-family: Arial; padding: 10px;")
+        self.connections_selector.currentIndexChanged.connect(self.change_download_connections)
+        layout.addWidget(self.connections_selector)
+
+        concurrent_label = QLabel("Concurrent Downloads")
+        concurrent_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
+        layout.addWidget(concurrent_label)
+
+        self.concurrent_downloads_selector = QComboBox()
+        self.concurrent_downloads_selector.addItems(["1", "2", "3", "4", "5"])
+        self.concurrent_downloads_selector.setCurrentText("2")
+        self.concurrent_downloads_selector.setStyleSheet("font-size: 18px; font-family: Arial; padding: 10px;")
+        self.concurrent_downloads_selector.currentIndexChanged.connect(self.change_concurrent_downloads)
+        layout.addWidget(self.concurrent_downloads_selector)
+
+        # Downloaded archives kept for reinstalls, least recently used dropped first
+        asset_cache_label = QLabel("Download Cache Size")
+        asset_cache_label.setStyleSheet("font-size: 18px; font-family: Arial; color: white;")
+        layout.addWidget(asset_cache_label)
+
+        self.asset_cache_selector = QComboBox()
+        for label, size in (("Off", 0), ("1 GB", 1), ("5 GB", 5), ("10 GB", 10), ("25 GB", 25), ("50 GB", 50)):
+            self.asset_cache_selector.addItem(label, size * 1024 * 1024 * 1024)
+        self.asset_cache_selector.setCurrentText("5 GB")
+        self.asset_cache_selector.setStyleSheet("font-size: 18px; font-family: Arial; padding: 10px;")
+        self.asset_cache_selector.currentIndexChanged.connect(self.change_asset_cache_size)
+        layout.addWidget(self.asset_cache_selector)
+
         import_rrct_button = QPushButton("Import RRCT")
         import_rrct_button.setStyleSheet("""
             QPushButton {
@@ -836,6 +1616,26 @@ class RepoRocket(QMainWindow):
             self.showNormal()
         self.save_settings()
 
+    def change_download_connections(self, index):
+        self.downloader.max_connections = int(self.connections_selector.currentText())
+        self.save_settings()
+
+    def change_concurrent_downloads(self, index):
+        self.download_manager.set_max_concurrent(int(self.concurrent_downloads_selector.currentText()))
+        self.save_settings()
+
+    def change_asset_cache_size(self, index):
+        self.asset_cache.set_max_bytes(self.asset_cache_selector.currentData())
+        self.save_settings()
+
+    def change_api_tokens(self):
+        self.apply_api_tokens()
+        self.save_settings()
+
+    def apply_api_tokens(self):
+        self.http.set_token("api.github.com", self.github_token_input.text().strip())
+        self.http.set_token("gitlab.com", self.gitlab_token_input.text().strip())
+
     def import_rrct(self):
         try:
             file_path, _ = QFileDialog.getOpenFileName(self, "Import RRCT", "", "RepoRocket Custom Theme (*.rrct)")
@@ -895,6 +1695,18 @@ class RepoRocket(QMainWindow):
             try:
                 with open(self.settings_path, "r") as f:
                     settings = json.load(f)
+                    # Restore tokens first, the handlers below re-save the settings file
+                    self.github_token_input.setText(settings.get("github_token", ""))
+                    self.gitlab_token_input.setText(settings.get("gitlab_token", ""))
+                    self.apply_api_tokens()
+                    self.connections_selector.setCurrentText(str(settings.get("max_download_connections", 4)))
+                    self.downloader.max_connections = int(self.connections_selector.currentText())
+                    self.concurrent_downloads_selector.setCurrentText(str(settings.get("max_concurrent_downloads", 2)))
+                    self.download_manager.max_concurrent = int(self.concurrent_downloads_selector.currentText())
+                    index = self.asset_cache_selector.findData(settings.get("asset_cache_size", 5 * 1024 * 1024 * 1024))
+                    if index >= 0:
+                        self.asset_cache_selector.setCurrentIndex(index)
+                    self.asset_cache.set_max_bytes(self.asset_cache_selector.currentData())
                     theme = settings.get("theme", "Default Dark")
                     self.theme_selector.setCurrentText(theme)
                     self.change_theme(self.theme_selector.currentIndex())
@@ -913,7 +1725,12 @@ class RepoRocket(QMainWindow):
         settings = {
             "theme": self.theme_selector.currentText(),
             "fullscreen": self.fullscreen_selector.currentText(),
-            "repo_source": self.repo_selector.currentText()
+            "repo_source": self.repo_selector.currentText(),
+            "github_token": self.github_token_input.text().strip(),
+            "gitlab_token": self.gitlab_token_input.text().strip(),
+            "max_download_connections": int(self.connections_selector.currentText()),
+            "max_concurrent_downloads": int(self.concurrent_downloads_selector.currentText()),
+            "asset_cache_size": self.asset_cache_selector.currentData()
         }
         with open(self.settings_path, "w") as f:
             json.dump(settings, f, indent=4)
@@ -923,7 +1740,7 @@ class RepoRocket(QMainWindow):
         file_dialog.setFileMode(QFileDialog.FileMode.Directory)
         if file_dialog.exec():
             selected_folder = file_dialog.selectedFiles()[0]
-            self.config[app_name]['cloud_save_location'] = selected_folder
+            self.config.setdefault(app_name, {})['cloud_save_location'] = selected_folder
             self.save_config()
             self.sync_cloud_save(app_name)
 
@@ -940,11 +1757,17 @@ class RepoRocket(QMainWindow):
                 else:
                     shutil.copy2(s, d)
 
-    def show_context_menu(self, pos, app_name, button):
+    def show_context_menu(self, global_pos, app_name):
         menu = QMenu(self)
 
+        update = self.available_updates.get(app_name)
+        if update:
+            update_action = QAction(f"Update to {update['release']}", self)
+            update_action.triggered.connect(lambda: self.update_application(app_name))
+            menu.addAction(update_action)
+
         change_artwork_action = QAction("Change Artwork", self)
-        change_artwork_action.triggered.connect(lambda: self.change_artwork(app_name, button))
+        change_artwork_action.triggered.connect(lambda: self.change_artwork(app_name))
         menu.addAction(change_artwork_action)
 
         cloud_save_action = QAction("Add Cloud Save Location", self)
@@ -957,16 +1780,24 @@ class RepoRocket(QMainWindow):
         delete_action.triggered.connect(lambda: self.delete_application(app_name))
         menu.addAction(delete_action)
 
-        menu.exec(button.mapToGlobal(pos))
+        menu.exec(global_pos)
 
     def delete_application(self, app_name):
         app_folder = os.path.join("applications", app_name)
         if os.path.exists(app_folder):
-            shutil.rmtree(app_folder)
+            # Hardlinks into the content store are read-only
+            remove_tree(app_folder)
+        self.content_store.remove_manifest(app_name)
+        # Frees the stored objects no other app links to; walks the whole store, so not on the GUI thread
+        worker = Worker(self.content_store.gc)
+        worker.signals.error.connect(lambda e, tb: self.log_error(f"Error cleaning up the content store: {e}\n{tb}"))
+        self.thread_pool.start(worker)
+        self.available_updates.pop(app_name, None)
+        self.library_model.set_updates(self.available_updates)
         if app_name in self.config:
             del self.config[app_name]
             self.save_config()
-        self.update_library_page()
+        self.library_index.refresh(app_name)
 
     def init_gamepads(self):
         for i in range(pygame.joystick.get_count()):
@@ -983,7 +1814,7 @@ class RepoRocket(QMainWindow):
                     elif event.button == 1:  # B button
                         self.show_search_page()
                     elif event.button == 6:  # Left menu button
-                        self.show_context_menu(self.current_focus.mapToGlobal(QPoint(0, 0)), self.current_focus.text(), self.current_focus)
+                        self.show_focused_context_menu()
                 elif event.type == pygame.JOYHATMOTION:
                     if event.value == (0, 1):  # Up
                         self.navigate_focus("up")
@@ -994,6 +1825,16 @@ class RepoRocket(QMainWindow):
                     elif event.value == (1, 0):  # Right
                         self.navigate_focus("right")
 
+    def show_focused_context_menu(self):
+        # Only library tiles have a context menu
+        if self.current_focus is not self.library_view:
+            return
+        index = self.library_view.currentIndex()
+        if not index.isValid():
+            return
+        center = self.library_view.visualRect(index).center()
+        self.show_context_menu(self.library_view.viewport().mapToGlobal(center), index.data())
+
     def navigate_focus(self, direction):
         if not self.current_focus:
             self.current_focus = self.side_panel.itemAt(0).widget()
@@ -1015,6 +1856,14 @@ class RepoRocket(QMainWindow):
             self.current_focus.setFocus()
 
     def get_next_focus(self, direction):
+        if direction in ["up", "down"] and self.current_focus is self.library_view:
+            # Step through the tiles in order, the view itself keeps focus
+            rows = self.library_model.rowCount()
+            if rows:
+                row = self.library_view.currentIndex().row()
+                row = (row - 1 if direction == "up" else row + 1) % rows
+                self.library_view.setCurrentIndex(self.library_model.index(row))
+            return self.library_view
         if direction in ["up", "down"]:
             parent_layout = self.current_focus.parent().layout()
             current_index = parent_layout.indexOf(self.current_focus)
@@ -1042,6 +1891,10 @@ class RepoRocket(QMainWindow):
                 self.current_focus.showPopup()
             elif isinstance(self.current_focus, QPushButton):
                 self.current_focus.click()
+            elif self.current_focus is self.library_view:
+                index = self.library_view.currentIndex()
+                if index.isValid():
+                    self.launch_app(index.data())
             elif isinstance(self.current_focus, QScrollArea):
                 # Handle QScrollArea differently if needed
                 pass
@@ -1062,6 +1915,12 @@ class RepoRocket(QMainWindow):
                 return True
         return super().eventFilter(obj, event)
 
+    def closeEvent(self, event):
+        # Running downloads keep their partial files and resume on the next launch
+        self.download_manager.shutdown()
+        self.library_index.close()
+        super().closeEvent(event)
+
     def load_themes(self):
         try:
             self.theme_selector.clear()
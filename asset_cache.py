@@ -0,0 +1,148 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from checksums import Hasher
+
+
+class AssetCache:
+    """
+    Size-bounded cache of downloaded release assets.
+
+    Archives are kept here after they have been installed instead of being
+    deleted, so reinstalling an app or rolling back to an older release is a
+    local copy. Files are stored once per SHA-256 under `files/` and looked up
+    by the provider's published digest when there is one, otherwise by URL
+    together with the ETag or Last-Modified the file was downloaded under, so
+    a copy is only used while the remote file is unchanged. Once the cache
+    grows past `max_bytes` the least recently used files are evicted; a quota
+    of 0 turns the cache off.
+    """
+
+    def __init__(self, root, max_bytes=5 * 1024 * 1024 * 1024):
+        self.root = root
+        self.files_path = os.path.join(root, "files")
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.files_path, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, "assets.sqlite3"), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                validator TEXT
+            );
+            CREATE INDEX IF NOT EXISTS files_accessed ON files (accessed_at);
+        """)
+        if "validator" not in [row[1] for row in self.db.execute("PRAGMA table_info(urls)")]:
+            # Rows from before validators were kept are never matched by URL
+            self.db.execute("ALTER TABLE urls ADD COLUMN validator TEXT")
+        self.db.commit()
+
+    def file_path(self, sha256):
+        return os.path.join(self.files_path, sha256)
+
+    def find(self, url, sha256=None, validator=None, digests=None):
+        """
+        Returns (path, sha256) of a cached copy of the asset, or None. Without
+        a `sha256` the copy of `url` is only returned when it was stored under
+        the same `validator`. Every digest in `digests` (hashlib name -> hex)
+        must match the copy as well.
+        """
+        with self.lock:
+            if sha256 is None:
+                row = self.db.execute("SELECT sha256, validator FROM urls WHERE url = ?", (url,)).fetchone()
+                if row is None or not validator or row[1] != validator:
+                    return None
+                sha256 = row[0]
+            sha256 = sha256.lower()
+            if self.db.execute("SELECT 1 FROM files WHERE sha256 = ?", (sha256,)).fetchone() is None:
+                return None
+            path = self.file_path(sha256)
+            if not os.path.exists(path):
+                # Removed behind our back
+                self.db.execute("DELETE FROM files WHERE sha256 = ?", (sha256,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE files SET accessed_at = ? WHERE sha256 = ?", (time.time(), sha256))
+            self.db.commit()
+        if not self.matches(path, sha256, digests or {}):
+            return None
+        return path, sha256
+
+    def matches(self, path, sha256, digests):
+        if digests.get("sha256", sha256).lower() != sha256:
+            return False
+        # Providers such as the Internet Archive only publish md5/sha1, which means reading the copy
+        others = {algorithm: value.lower() for algorithm, value in digests.items()
+                  if algorithm != "sha256" and algorithm in hashlib.algorithms_available}
+        if not others:
+            return True
+        hasher = Hasher(others)
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+        except OSError:
+            # Evicted in the meantime
+            return False
+        return hasher.hexdigests() == others
+
+    def add(self, path, url, sha256, validator=None):
+        # Takes the file over; it is simply deleted when the cache is off or the file cannot fit
+        size = os.path.getsize(path)
+        if size > self.max_bytes:
+            os.remove(path)
+            return None
+        target = self.file_path(sha256)
+        with self.lock:
+            if os.path.exists(target):
+                os.remove(path)
+            else:
+                try:
+                    os.replace(path, target)
+                except OSError:
+                    # Downloads folder on another filesystem
+                    shutil.move(path, target)
+            now = time.time()
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (sha256, size, now, now))
+            self.db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, sha256, validator))
+            self.evict()
+            self.db.commit()
+        return target
+
+    def set_max_bytes(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+            self.db.commit()
+
+    def total_bytes(self):
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+
+    def evict(self):
+        # Caller holds the lock; drop least recently used files until within the quota
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for sha256, size in self.db.execute("SELECT sha256, size FROM files ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                if os.path.exists(self.file_path(sha256)):
+                    os.remove(self.file_path(sha256))
+            except OSError:
+                # Still open by an install on Windows, try again next time
+                continue
+            self.db.execute("DELETE FROM files WHERE sha256 = ?", (sha256,))
+            self.db.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+            total -= size
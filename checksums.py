@@ -0,0 +1,72 @@
+import hashlib
+import re
+
+# Release assets that carry checksums for the other assets of the same release
+CHECKSUM_FILE_PATTERN = re.compile(r"(sha256sums?|checksums?)(\.txt)?$|\.sha256(sum)?$", re.IGNORECASE)
+CHECKSUM_LINE_PATTERN = re.compile(r"^([0-9a-fA-F]{64})(?:\s+\*?(.+?))?\s*$")
+
+
+class ChecksumMismatch(Exception):
+    def __init__(self, algorithm, expected, actual):
+        self.algorithm = algorithm
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"{algorithm} mismatch: expected {expected}, got {actual}")
+
+
+class Hasher:
+    """Feeds the same bytes to several hashlib digests at once."""
+
+    def __init__(self, algorithms=("sha256",)):
+        self.digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+
+    def update(self, data):
+        for digest in self.digests.values():
+            digest.update(data)
+
+    def hexdigests(self):
+        return {algorithm: digest.hexdigest() for algorithm, digest in self.digests.items()}
+
+
+def is_checksum_file(name):
+    return bool(CHECKSUM_FILE_PATTERN.search(name))
+
+
+def parse_provider_digest(digest):
+    # GitHub reports asset digests as "sha256:<hex>"
+    if not digest or ":" not in digest:
+        return {}
+    algorithm, value = digest.split(":", 1)
+    return {algorithm.lower(): value.lower()}
+
+
+def parse_checksum_file(text):
+    """
+    Parses sha256sum output into {file name: hex digest}. A bare digest, as
+    found in per-file `<asset>.sha256` sidecars, is stored under "".
+    """
+    checksums = {}
+    for line in text.splitlines():
+        match = CHECKSUM_LINE_PATTERN.match(line.strip())
+        if match:
+            name = match.group(2) or ""
+            checksums[name[2:] if name.startswith("./") else name] = match.group(1).lower()
+    return checksums
+
+
+def find_checksum_file(asset_name, names):
+    # Prefer a sidecar for this asset, then a release-wide checksum list
+    for suffix in (".sha256", ".sha256sum"):
+        if asset_name + suffix in names:
+            return asset_name + suffix
+    for name in names:
+        if is_checksum_file(name) and name != asset_name and not name.endswith((".sha256", ".sha256sum")):
+            return name
+    return None
+
+
+def verify(expected, actual):
+    # Only algorithms present on both sides are compared
+    for algorithm, value in expected.items():
+        if algorithm in actual and actual[algorithm] != value.lower():
+            raise ChecksumMismatch(algorithm, value.lower(), actual[algorithm])
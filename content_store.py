@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No reflinks on Windows, hardlinks still work on NTFS
+    fcntl = None
+
+# ioctl that asks btrfs/XFS/bcachefs to share a file's extents copy-on-write
+FICLONE = 0x40049409
+
+
+def remove_file(path):
+    # Windows refuses to delete read-only files, which hardlinked store objects are
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+
+
+def remove_tree(path, ignore_errors=False):
+    def retry_writable(function, failed_path, _):
+        try:
+            os.chmod(failed_path, stat.S_IREAD | stat.S_IWRITE)
+            function(failed_path)
+        except OSError:
+            if not ignore_errors:
+                raise
+
+    shutil.rmtree(path, onerror=retry_writable)
+
+
+class ContentStore:
+    """
+    Content-addressed object store shared by every installed app.
+
+    File contents live once under `objects/` keyed by SHA-256 and each app
+    tree is made of links to them: a reflink where the filesystem supports
+    copy-on-write clones, otherwise a hardlink, otherwise a plain copy.
+    Objects are read-only, so an app writing to one of its hardlinked files
+    cannot change what other apps share; reflinks and copies are the app's
+    own and stay writable. A JSON
+    manifest per app records path, digest, size, zip CRC-32, executable bit
+    and the release asset it came from for every file, so a zip member whose
+    (CRC, size) is already known can be linked without being decompressed at
+    all. Objects no manifest refers to are removed by gc().
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_path = os.path.join(root, "objects")
+        self.manifests_path = os.path.join(root, "manifests")
+        self.tmp_path = os.path.join(root, "tmp")
+        for path in (self.objects_path, self.manifests_path, self.tmp_path):
+            os.makedirs(path, exist_ok=True)
+        self.lock = threading.Lock()
+        # Installs in progress hold objects no manifest refers to yet
+        self.active_installs = 0
+        self.reflinks = fcntl is not None
+        self.manifests = {}
+        self.crc_index = {}
+        for file_name in os.listdir(self.manifests_path):
+            if file_name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.manifests_path, file_name), "r") as f:
+                        manifest = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                self.manifests[manifest["app"]] = manifest["files"]
+                self.index(manifest["files"])
+
+    def index(self, files):
+        for entry in files.values():
+            if entry.get("crc") is not None:
+                self.crc_index[(entry["crc"], entry["size"])] = entry["sha256"]
+
+    def object_path(self, sha256, executable=False):
+        # Executables get their own copy of the object, links share permission bits
+        name = sha256 + ("-x" if executable else "")
+        return os.path.join(self.objects_path, sha256[:2], name)
+
+    def temp_file(self):
+        fd, path = tempfile.mkstemp(dir=self.tmp_path)
+        return os.fdopen(fd, "wb"), path
+
+    def add(self, temp_path, sha256, executable=False):
+        # Moves a freshly written file into the store, or drops it if the content is already there
+        path = self.object_path(sha256, executable)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.chmod(temp_path, self.object_mode(executable))
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            # Files handed over from another filesystem
+            shutil.move(temp_path, path)
+        return path
+
+    def add_file(self, path, executable=False, sha256=None):
+        # Takes over an existing file (e.g. extracted by a third-party library)
+        if sha256 is None:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            sha256 = digest.hexdigest()
+        self.add(path, sha256, executable)
+        return sha256
+
+    def find(self, crc, size, executable=False):
+        """Returns the digest of a stored object with this zip CRC-32 and size, if any."""
+        with self.lock:
+            sha256 = self.crc_index.get((crc, size))
+        if sha256 and (os.path.exists(self.object_path(sha256, executable))
+                       or os.path.exists(self.object_path(sha256, not executable))):
+            return sha256
+        return None
+
+    def object_mode(self, executable):
+        return 0o555 if executable else 0o444
+
+    def link(self, sha256, target, executable=False):
+        path = self.object_path(sha256, executable)
+        if not os.path.exists(path):
+            # Only the other permission variant is stored yet
+            self.clone_or_copy(self.object_path(sha256, not executable), path)
+        # Also puts back the mode of an object whose link was made writable to delete it on Windows
+        os.chmod(path, self.object_mode(executable))
+        if os.path.lexists(target):
+            # Never write through an existing link into a shared object
+            remove_file(target)
+        if not (self.reflinks and self.clone(path, target)):
+            try:
+                os.link(path, target)
+                return
+            except OSError:
+                shutil.copyfile(path, target)
+        # A copy of its own, which the app may change
+        os.chmod(target, 0o755 if executable else 0o644)
+
+    def clone(self, source, target):
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            if os.path.exists(target):
+                os.remove(target)
+            # Same filesystem for every object, so don't try again
+            self.reflinks = False
+            return False
+
+    def clone_or_copy(self, source, target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if not (self.reflinks and self.clone(source, target)):
+            shutil.copyfile(source, target)
+
+    def begin_install(self):
+        with self.lock:
+            self.active_installs += 1
+
+    def end_install(self):
+        with self.lock:
+            self.active_installs -= 1
+
+    def manifest(self, app):
+        with self.lock:
+            return dict(self.manifests.get(app, {}))
+
+    def save_manifest(self, app, files, removed=()):
+        """
+        Merges `files` into the app's manifest and drops the `removed` paths.
+        Returns whether an existing file changed, call gc() afterwards then.
+        """
+        with self.lock:
+            previous = self.manifests.get(app, {})
+            merged = {name: entry for name, entry in previous.items() if name not in removed}
+            merged.update(files)
+            replaced = any(name not in merged or (merged[name]["sha256"], merged[name].get("executable"))
+                           != (entry["sha256"], entry.get("executable")) for name, entry in previous.items())
+            self.manifests[app] = files = merged
+            self.index(files)
+            manifest_file = os.path.join(self.manifests_path, self.manifest_name(app))
+            with open(manifest_file + ".tmp", "w") as f:
+                json.dump({"app": app, "files": files}, f)
+            os.replace(manifest_file + ".tmp", manifest_file)
+        return replaced
+
+    def remove_manifest(self, app):
+        # Call gc() afterwards to free the objects only this app used
+        with self.lock:
+            self.manifests.pop(app, None)
+            manifest_file = os.path.join(self.manifests_path, self.manifest_name(app))
+            if os.path.exists(manifest_file):
+                os.remove(manifest_file)
+
+    def manifest_name(self, app):
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in app) + ".json"
+
+    def gc(self):
+        """Deletes objects no manifest refers to and returns the bytes freed."""
+        with self.lock:
+            if self.active_installs:
+                # Runs again once a later install or delete settles
+                return 0
+            referenced = set()
+            for files in self.manifests.values():
+                for entry in files.values():
+                    referenced.add(os.path.basename(self.object_path(entry["sha256"], entry.get("executable", False))))
+            self.crc_index = {}
+            for files in self.manifests.values():
+                self.index(files)
+            # Still under the lock, so no install can start linking an object being deleted
+            freed = 0
+            for folder in os.listdir(self.objects_path):
+                folder_path = os.path.join(self.objects_path, folder)
+                for name in os.listdir(folder_path):
+                    if name not in referenced:
+                        path = os.path.join(folder_path, name)
+                        freed += os.path.getsize(path)
+                        remove_file(path)
+            return freed
@@ -0,0 +1,132 @@
+import os
+import stat
+import zipfile
+from downloader import RemoteFileChanged, DownloadStopped
+from extractor import GrowingFile, StreamingExtractor, fetch_zip_directory, common_top_folder, strip_prefix
+
+
+class DeltaUpdate:
+    # What prepare() found out about a release zip
+    def __init__(self, url, size, validator, part_path, source, ranges, changed, removed):
+        self.url = url
+        self.size = size
+        self.validator = validator
+        self.part_path = part_path
+        self.source = source
+        self.ranges = ranges
+        self.changed = changed
+        self.removed = removed
+
+    @property
+    def fetch_bytes(self):
+        return sum(end - start for start, end in self.ranges)
+
+
+class DeltaUpdater:
+    """
+    Updates an installed asset of an app from the release zip that replaces
+    it, without downloading all of it.
+
+    prepare() reads only the end of the remote zip to get its central
+    directory and compares every member's CRC-32 and size with what the
+    content store already holds. fetch() then downloads just the byte ranges
+    of the members that changed, neighbours closer than `max_gap` bytes
+    merged into one request, into a sparse `.part` file. install() runs the
+    normal extractor over it: known members are linked from the store on
+    their CRC-32 and size and only the fetched ones are inflated. Each member is still checked against
+    its CRC-32 as it is decompressed. Files of the replaced asset that the new
+    zip no longer ships are removed; files installed from other assets of the
+    same app are left alone.
+    """
+
+    def __init__(self, downloader, store, max_gap=64 * 1024):
+        self.downloader = downloader
+        self.http = downloader.http
+        self.store = store
+        self.max_gap = max_gap
+
+    def prepare(self, url, app, replaces, part_path):
+        """
+        Returns a DeltaUpdate for the zip at `url` replacing the installed
+        asset `replaces`, or None when a full download is needed.
+        """
+        previous = [name for name, entry in self.store.manifest(app).items() if entry.get("asset") == replaces]
+        if not previous:
+            return None
+        final_url, size, supports_ranges, validator = self.downloader.probe(url)
+        if not supports_ranges or not size or not validator:
+            return None
+
+        source = GrowingFile(part_path)
+        source.update([], size)
+        headers = {"If-Range": validator}
+        cd_offset = fetch_zip_directory(self.http, final_url, source, size, headers=headers)
+        if cd_offset is None:
+            return None
+        try:
+            with zipfile.ZipFile(source) as archive:
+                members = sorted(archive.infolist(), key=lambda info: info.header_offset)
+        except zipfile.BadZipFile:
+            return None
+
+        prefix = common_top_folder([info.filename for info in members])
+        ends = [info.header_offset for info in members[1:]] + [cd_offset]
+        changed = []
+        names = set()
+        for info, end in zip(members, ends):
+            if info.is_dir():
+                continue
+            names.add(strip_prefix(info.filename, prefix))
+            mode = info.external_attr >> 16 if info.create_system == 3 else 0
+            if stat.S_ISLNK(mode) or not self.store.find(info.CRC, info.file_size, bool(mode & 0o111)):
+                # A member's bytes run up to the next local header, data descriptor included
+                changed.append((info.header_offset, end))
+        removed = [name for name in previous if name not in names]
+        return DeltaUpdate(final_url, size, validator, part_path, source, self.coalesce(changed), changed, removed)
+
+    def coalesce(self, ranges):
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start - merged[-1][1] <= self.max_gap:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def fetch(self, update, progress=None, stop_event=None):
+        with open(update.part_path, "wb") as f:
+            # Sparse on most filesystems, only the fetched ranges take up space
+            f.truncate(update.size)
+        fetched = []
+        done = 0
+        total = update.fetch_bytes
+        with open(update.part_path, "r+b") as f:
+            for start, end in update.ranges:
+                headers = {"Range": f"bytes={start}-{end - 1}", "If-Range": update.validator, "Accept-Encoding": "identity"}
+                with self.http.get(update.url, stream=True, headers=headers) as response:
+                    response.raise_for_status()
+                    if response.status_code == 200:
+                        raise RemoteFileChanged("The remote file changed since its directory was read")
+                    f.seek(start)
+                    for chunk in self.downloader.stream_response(response):
+                        if stop_event is not None and stop_event.is_set():
+                            raise DownloadStopped()
+                        f.write(chunk)
+                        done += len(chunk)
+                        if progress:
+                            progress(done, total)
+                f.flush()
+                fetched.append((start, end))
+                update.source.update(fetched, update.size)
+        # Nothing else is coming, reading outside the fetched ranges is a bug rather than a wait
+        update.source.seal()
+
+    def install(self, update, dest, app, asset, progress=None, stop_event=None):
+        try:
+            extractor = StreamingExtractor(update.source, dest, progress=progress, stop_event=stop_event,
+                                           store=self.store, app=app, asset=asset, kind="zip", removed=update.removed,
+                                           trust_crc=True)
+            return extractor.run()
+        finally:
+            if os.path.exists(update.part_path):
+                os.remove(update.part_path)
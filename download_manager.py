@@ -0,0 +1,400 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+from workers import Worker
+from downloader import DownloadStopped, RemoteFileChanged
+from extractor import GrowingFile
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class DownloadJob:
+    def __init__(self, url, path, repo_name, priority=0, job_id=None, state=QUEUED, done=0, total=None,
+                 error=None, created_at=None, info=None, result=None, sha256=None, validator=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.url = url
+        self.path = path
+        self.repo_name = repo_name
+        self.priority = priority
+        self.state = state
+        self.done = done
+        self.total = total
+        self.error = error
+        self.created_at = created_at or time.time()
+        # Free-form install details (provider, release, ...) carried with the job
+        self.info = info or {}
+        self.result = result
+        # Digest of the completed download, computed while it streamed in
+        self.sha256 = sha256
+        # ETag or Last-Modified of the remote file, when it was checked against the asset cache
+        self.validator = validator
+        # Runtime only: what the worker is doing right now and how to stop it. Each run
+        # gets its own stop event, which stays set until that run has reported back
+        self.phase = None
+        self.speed = None
+        self.stop_event = None
+
+    @property
+    def eta(self):
+        # Seconds left at the current speed, None when unknown
+        if not self.speed or not self.total or self.phase != "Downloading":
+            return None
+        return max(0, self.total - self.done) / self.speed
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.path)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "url": self.url,
+            "path": self.path,
+            "repo_name": self.repo_name,
+            "priority": self.priority,
+            "state": self.state,
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "created_at": self.created_at,
+            "info": self.info,
+            "result": self.result,
+            "sha256": self.sha256,
+            "validator": self.validator,
+        }
+
+
+class DownloadManager(QObject):
+    """
+    Persistent download queue.
+
+    Jobs run on a dedicated thread pool, at most `max_concurrent` at a time,
+    highest priority first. While a job downloads, the `install` callback runs
+    alongside it on a second thread, reading the file through a GrowingFile
+    so archives are unpacked as they arrive; the GUI thread only ever sees
+    signals. Pausing stops a job but keeps its
+    partial file for resuming; the queue survives restarts. A paused or
+    cancelled job keeps its slot until its worker has actually stopped, so a
+    quick resume never has two runs writing the same partial file. Jobs for
+    the same app run one after another, they install into the same folder.
+
+    With an AssetCache, a job whose asset is cached is installed straight from
+    the local copy: found by its published SHA-256, or by URL as long as the
+    remote file's ETag/Last-Modified is unchanged, and only when every
+    published digest matches the copy.
+    Jobs whose info names the installed asset they `replaces` first go
+    through the optional `update` callback, which patches the installed app
+    in place (see DeltaUpdater) or returns None when a full download is
+    needed after all. A patch that fails is reported through update_failed
+    before falling back.
+    """
+
+    job_changed = pyqtSignal(str)
+    job_completed = pyqtSignal(str)
+    job_failed = pyqtSignal(str)
+    # (job id, error, traceback) of a delta update that fell back to a full download
+    update_failed = pyqtSignal(str, object, str)
+    progress_changed = pyqtSignal()
+    job_progress = pyqtSignal(str)
+
+    def __init__(self, downloader, install, queue_path, max_concurrent=2, update=None, cache=None, parent=None):
+        super().__init__(parent)
+        self.downloader = downloader
+        self.install = install
+        self.update = update
+        self.cache = cache
+        self.queue_path = queue_path
+        self.max_concurrent = max_concurrent
+        # Progress signals are throttled to this interval whatever the download rate
+        self.progress_interval = 0.1
+        self.jobs = {}
+        self.workers = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(16)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.queue_path):
+            return
+        try:
+            with open(self.queue_path, "r") as f:
+                for data in json.load(f):
+                    job = DownloadJob(**data)
+                    if job.state == RUNNING:
+                        # Interrupted by a quit, pick it up again from its .part file
+                        job.state = QUEUED
+                    self.jobs[job.id] = job
+        except (OSError, json.JSONDecodeError, TypeError):
+            self.jobs = {}
+
+    def save(self):
+        with open(self.queue_path, "w") as f:
+            json.dump([job.to_dict() for job in self.jobs.values()], f, indent=4)
+
+    def ordered_jobs(self):
+        return sorted(self.jobs.values(), key=lambda job: (-job.priority, job.created_at))
+
+    def add(self, url, path, repo_name, priority=0, info=None):
+        job = DownloadJob(url, path, repo_name, priority=priority, info=info)
+        self.jobs[job.id] = job
+        self.save()
+        self.job_changed.emit(job.id)
+        self.schedule()
+        return job
+
+    def set_max_concurrent(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self.schedule()
+
+    def schedule(self):
+        # Jobs still winding down after a pause or cancel count until their worker reports back
+        active = [job for job in self.jobs.values() if job.state == RUNNING or job.stop_event is not None]
+        running = len(active)
+        busy = {job.repo_name for job in active}
+        for job in self.ordered_jobs():
+            if running >= self.max_concurrent:
+                break
+            if job.state == QUEUED and job.stop_event is None and job.repo_name not in busy:
+                self.start(job)
+                running += 1
+                busy.add(job.repo_name)
+
+    def start(self, job):
+        job.state = RUNNING
+        job.error = None
+        stop_event = job.stop_event = threading.Event()
+        worker = Worker(self.run_job, job, stop_event)
+        worker.signals.result.connect(
+            lambda result, job_id=job.id, run=stop_event: self.on_job_finished(job_id, run, result))
+        worker.signals.error.connect(
+            lambda e, tb, job_id=job.id, run=stop_event: self.on_job_error(job_id, run, e, tb))
+        self.workers[job.id] = worker
+        self.pool.start(worker)
+        self.save()
+        self.job_changed.emit(job.id)
+
+    def run_job(self, job, stop_event):
+        # Runs on the download pool
+        last_emit = [0]
+        sample = [None, 0]
+
+        def progress(done, total):
+            job.done = done
+            job.total = total
+            now = time.monotonic()
+            if job.phase == "Downloading":
+                # Smoothed transfer rate over half-second windows
+                if sample[0] is None:
+                    sample[:] = [now, done]
+                elif now - sample[0] >= 0.5:
+                    rate = (done - sample[1]) / (now - sample[0])
+                    job.speed = rate if job.speed is None else 0.7 * job.speed + 0.3 * rate
+                    sample[:] = [now, done]
+            if now - last_emit[0] >= self.progress_interval:
+                last_emit[0] = now
+                self.job_progress.emit(job.id)
+                self.progress_changed.emit()
+
+        expected = dict(job.info.get("digests") or {})
+        if "sha256" not in expected and job.info.get("checksums_url"):
+            checksums = self.downloader.fetch_checksums(job.info["checksums_url"])
+            digest = checksums.get(job.info.get("asset", job.file_name)) or checksums.get("")
+            if digest:
+                expected["sha256"] = digest
+
+        def install_progress(done, total):
+            # Only shown once the download itself is finished
+            if job.phase == "Installing":
+                progress(done, total)
+
+        try:
+            return self.update_or_install(job, expected, progress, install_progress, stop_event)
+        except RemoteFileChanged:
+            # The release was replaced mid-download, anything installed from it has been rolled back
+            return self.update_or_install(job, expected, progress, install_progress, stop_event)
+
+    def update_or_install(self, job, expected, progress, install_progress, stop_event):
+        if job.sha256 and os.path.exists(job.path):
+            # Downloaded and verified by an earlier run that was stopped or failed while installing
+            job.phase = "Installing"
+            return self.install(job, GrowingFile.from_file(job.path), install_progress, stop_event)
+        job.sha256 = None
+        cached = self.find_cached(job, expected)
+        if cached:
+            # Installed from the local copy, nothing to fetch
+            job.sha256 = cached[1]
+            job.phase = "Installing"
+            return self.install(job, GrowingFile.from_file(cached[0]), install_progress, stop_event)
+        if job.info.get("replaces") and self.update is not None:
+            job.phase = "Downloading"
+            try:
+                result = self.update(job, progress, install_progress, stop_event)
+            except (DownloadStopped, RemoteFileChanged):
+                raise
+            except Exception as e:
+                # Anything unexpected in the patch path, a full download still gets the app installed
+                self.update_failed.emit(job.id, e, traceback.format_exc())
+                result = None
+            if result is not None:
+                return result
+            job.phase = None
+        return self.download_and_install(job, expected, progress, install_progress, stop_event)
+
+    def find_cached(self, job, expected):
+        if self.cache is None:
+            return None
+        job.validator = None
+        if "sha256" in expected:
+            return self.cache.find(job.url, expected["sha256"], digests=expected)
+        # A copy found by URL alone is only good while the remote file is unchanged
+        job.validator = self.downloader.probe(job.url)[3]
+        return self.cache.find(job.url, validator=job.validator, digests=expected)
+
+    def download_and_install(self, job, expected, progress, install_progress, stop_event):
+        source = GrowingFile(job.path + ".part")
+        outcome = {}
+
+        def install():
+            try:
+                outcome["result"] = self.install(job, source, install_progress, stop_event)
+            except BaseException as e:
+                outcome["error"] = e
+
+        installer = threading.Thread(target=install, daemon=True)
+        installer.start()
+        job.phase = "Downloading"
+        try:
+            # The validator the cache was checked with is the one the copy gets stored under
+            digests = self.downloader.download(job.url, job.path, progress=progress, stop_event=stop_event,
+                                               digests=expected, tap=source, validator=job.validator)
+        except BaseException as e:
+            source.fail(e)
+            installer.join()
+            raise
+        job.sha256 = digests["sha256"]
+        job.phase = "Installing"
+        job.speed = None
+        installer.join()
+        if "result" in outcome:
+            # Installed, even if a pause or cancel came in after the install committed
+            return outcome["result"]
+        raise outcome["error"]
+
+    def on_job_finished(self, job_id, run, result):
+        job = self.jobs.get(job_id)
+        if job is None or job.stop_event is not run:
+            # Not the job's current run
+            return
+        self.workers.pop(job_id, None)
+        job.state = COMPLETED
+        job.result = result
+        job.phase = None
+        job.speed = None
+        job.stop_event = None
+        self.save()
+        self.job_changed.emit(job_id)
+        self.job_completed.emit(job_id)
+        self.progress_changed.emit()
+        self.schedule()
+
+    def on_job_error(self, job_id, run, e, error_traceback):
+        job = self.jobs.get(job_id)
+        if job is None or job.stop_event is not run:
+            return
+        self.workers.pop(job_id, None)
+        job.phase = None
+        job.speed = None
+        job.stop_event = None
+        if isinstance(e, DownloadStopped):
+            if job.state == CANCELLED:
+                self.discard_partial(job)
+        else:
+            job.state = FAILED
+            job.error = f"{e}"
+            self.job_failed.emit(job_id)
+        self.save()
+        self.job_changed.emit(job_id)
+        self.progress_changed.emit()
+        self.schedule()
+
+    def pause(self, job_id):
+        job = self.jobs[job_id]
+        if job.state == RUNNING:
+            job.state = PAUSED
+            job.stop_event.set()
+        elif job.state == QUEUED:
+            job.state = PAUSED
+        self.save()
+        self.job_changed.emit(job_id)
+        self.schedule()
+
+    def resume(self, job_id):
+        job = self.jobs[job_id]
+        if job.state in (PAUSED, FAILED):
+            job.state = QUEUED
+            self.save()
+            self.job_changed.emit(job_id)
+            self.schedule()
+
+    def cancel(self, job_id):
+        job = self.jobs[job_id]
+        if job.stop_event is not None:
+            # Its worker discards the partial file once it has stopped writing it
+            job.state = CANCELLED
+            job.stop_event.set()
+        elif job.state in (QUEUED, PAUSED, FAILED):
+            job.state = CANCELLED
+            self.discard_partial(job)
+        self.save()
+        self.job_changed.emit(job_id)
+        self.progress_changed.emit()
+
+    def change_priority(self, job_id, delta):
+        self.jobs[job_id].priority += delta
+        self.save()
+        self.job_changed.emit(job_id)
+        self.schedule()
+
+    def remove(self, job_id):
+        job = self.jobs.get(job_id)
+        if job and job.state in (COMPLETED, FAILED, CANCELLED) and job.stop_event is None:
+            del self.jobs[job_id]
+            self.save()
+            self.job_changed.emit(job_id)
+
+    def discard_partial(self, job):
+        # A run stopped while installing leaves the whole verified download behind
+        for path in (job.path, job.path + ".part", job.path + ".part.json"):
+            if os.path.exists(path):
+                os.remove(path)
+        try:
+            # Nothing was installed from it, so its folder goes too unless other downloads share it
+            os.rmdir(os.path.dirname(job.path))
+        except OSError:
+            pass
+
+    def aggregate_progress(self):
+        # (done, total, active job count, combined speed) over everything not yet finished
+        active = [job for job in self.jobs.values() if job.state in (QUEUED, RUNNING)]
+        done = sum(job.done for job in active if job.total)
+        total = sum(job.total for job in active if job.total)
+        speed = sum(job.speed for job in active if job.speed)
+        return done, total, len(active), speed
+
+    def shutdown(self):
+        # Stop running jobs but leave them RUNNING on disk so they resume next launch
+        for job in self.jobs.values():
+            if job.state == RUNNING and job.stop_event:
+                job.stop_event.set()
+        self.save()
+        self.pool.waitForDone(3000)
@@ -0,0 +1,311 @@
+import json
+import os
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from checksums import Hasher, ChecksumMismatch, parse_checksum_file, verify
+
+
+class RemoteFileChanged(Exception):
+    pass
+
+
+class DownloadStopped(Exception):
+    # Raised when the caller's stop event is set; the partial file is kept
+    pass
+
+
+class SegmentedDownloader:
+    """
+    Download engine for release assets.
+
+    The server is probed with a one-byte Range request. When it honours ranges
+    and the file is large enough, the file is preallocated and split into up
+    to `max_connections` segments fetched in parallel over the shared HTTP
+    client, each writing into its own slice of the file. Otherwise the asset is
+    streamed over a single connection.
+
+    Data goes to `<path>.part` with a `<path>.part.json` sidecar recording the
+    URL, validator (ETag or Last-Modified), size and bytes completed per
+    segment. An interrupted download continues from there with If-Range
+    requests once the remote file is confirmed unchanged.
+
+    Each connection reads into one reusable buffer whose read size adapts
+    between `min_chunk_size` and `max_chunk_size` to the link speed, and
+    progress is reported at a fixed rate rather than per chunk.
+
+    A SHA-256 (plus any algorithm the caller expects) is computed as the data
+    arrives: inline while a connection writes the next unhashed bytes, and
+    otherwise by catching up over the contiguous prefix of the `.part` file
+    while it is still in the page cache. The result is checked before the
+    file is moved into place, so a corrupt download never reaches extraction.
+
+    An optional `tap` (see extractor.GrowingFile) is told which byte ranges
+    are on disk as they land, so an archive can be unpacked while it downloads.
+    """
+
+    def __init__(self, http, max_connections=4, min_segment_size=4 * 1024 * 1024,
+                 min_chunk_size=64 * 1024, max_chunk_size=4 * 1024 * 1024, progress_interval=0.1):
+        self.http = http
+        self.max_connections = max_connections
+        self.min_segment_size = min_segment_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.progress_interval = progress_interval
+
+    def probe(self, url):
+        # Returns (final_url, total_size or None, supports_ranges, validator);
+        # redirects are resolved once here so segments go straight to the CDN
+        response = self.http.get(url, stream=True, headers={"Range": "bytes=0-0", "Accept-Encoding": "identity"})
+        try:
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            # If-Range only accepts strong validators
+            validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+            if response.status_code == 206:
+                total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+                if total.isdigit():
+                    return response.url, int(total), True, validator
+                return response.url, None, False, validator
+            total = response.headers.get("Content-Length")
+            return response.url, int(total) if total and total.isdigit() else None, False, validator
+        finally:
+            response.close()
+
+    def plan_segments(self, total):
+        count = max(1, min(self.max_connections, total // self.min_segment_size))
+        size = total // count
+        segments = []
+        for i in range(count):
+            start = i * size
+            end = total - 1 if i == count - 1 else start + size - 1
+            segments.append({"start": start, "end": end, "done": 0})
+        return segments
+
+    def load_resume_state(self, meta_path, part_path, url, total, validator):
+        if not (os.path.exists(meta_path) and os.path.exists(part_path)):
+            return None
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url or meta.get("size") != total or not validator or meta.get("validator") != validator:
+            return None
+        if os.path.getsize(part_path) != total:
+            return None
+        return meta
+
+    def save_resume_state(self, meta_path, meta, lock):
+        with lock:
+            snapshot = json.dumps(meta)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, meta_path)
+
+    def download(self, url, path, progress=None, stop_event=None, digests=None, tap=None, validator=None):
+        """
+        Download `url` to `path`. `progress(done, total)` is called from the
+        calling thread only; total is None when the server does not say.
+        Setting `stop_event` aborts with DownloadStopped, leaving the partial
+        file ready to resume. `digests` maps hashlib names to the expected hex
+        digests; a mismatch raises ChecksumMismatch and discards the data.
+        `validator`, when given, is the ETag or Last-Modified the caller last
+        saw; a different one raises RemoteFileChanged. Returns the hex digests
+        computed on the way.
+        """
+        try:
+            return self.download_once(url, path, progress, stop_event, digests or {}, tap, validator)
+        except RemoteFileChanged:
+            if tap is not None:
+                # Whatever was read from the old file is invalid now
+                raise
+            # The partial data belongs to an older file, start over
+            return self.download_once(url, path, progress, stop_event, digests or {}, tap, validator)
+
+    def fetch_checksums(self, url):
+        # Checksum sidecars are tiny, an ordinary request will do
+        response = self.http.get(url)
+        response.raise_for_status()
+        return parse_checksum_file(response.text)
+
+    def download_once(self, url, path, progress, stop_event, digests, tap, expected_validator=None):
+        part_path = path + ".part"
+        meta_path = part_path + ".json"
+        final_url, total, supports_ranges, validator = self.probe(url)
+        if expected_validator is not None and validator != expected_validator:
+            raise RemoteFileChanged("The remote file changed since it was last checked")
+
+        meta = self.load_resume_state(meta_path, part_path, url, total, validator) if supports_ranges and total else None
+        if meta is None:
+            if supports_ranges and total:
+                segments = self.plan_segments(total)
+            else:
+                segments = [{"start": 0, "end": total - 1 if total else None, "done": 0}]
+            meta = {"url": url, "size": total, "validator": validator, "segments": segments}
+            with open(part_path, "wb") as f:
+                if supports_ranges and total:
+                    # Preallocate so every segment can write at its own offset
+                    f.truncate(total)
+
+        lock = threading.Lock()
+        algorithms = {"sha256"} | {algorithm for algorithm in digests if algorithm in hashlib.algorithms_available}
+        # Everything before `offset` has been fed to the hasher
+        hashing = {"hasher": Hasher(algorithms), "offset": 0, "lock": threading.Lock()}
+        self.save_resume_state(meta_path, meta, lock)
+        try:
+            self.fetch_segments(final_url, part_path, meta, supports_ranges, progress, meta_path, lock, stop_event, hashing, tap)
+        except RemoteFileChanged:
+            for stale in (part_path, meta_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            raise
+        except BaseException:
+            if supports_ranges and total:
+                self.save_resume_state(meta_path, meta, lock)
+            raise
+
+        done = sum(segment["done"] for segment in meta["segments"])
+        if total and done != total:
+            raise Exception(f"Download incomplete: got {done} of {total} bytes")
+        self.hash_until(part_path, hashing, done)
+        computed = hashing["hasher"].hexdigests()
+        try:
+            verify(digests, computed)
+        except ChecksumMismatch:
+            # Corrupt data must not be resumed from either
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise
+        if tap is not None:
+            # The tap moves the file itself so none of its reads straddle the rename
+            tap.replace(part_path, path)
+        else:
+            os.replace(part_path, path)
+        os.remove(meta_path)
+        return computed
+
+    def contiguous_done(self, meta):
+        # Bytes written without gaps from the start of the file; segments are adjacent
+        done = 0
+        for segment in meta["segments"]:
+            done += segment["done"]
+            if segment["end"] is None or segment["start"] + segment["done"] <= segment["end"]:
+                break
+        return done
+
+    def hash_until(self, part_path, hashing, watermark, budget=None):
+        # Feeds part_path[offset:watermark] to the hasher, at most `budget` bytes per call
+        buffer = memoryview(bytearray(1024 * 1024))
+        with open(part_path, "rb") as f:
+            while hashing["offset"] < watermark and (budget is None or budget > 0):
+                with hashing["lock"]:
+                    offset = hashing["offset"]
+                    f.seek(offset)
+                    read = f.readinto(buffer[:min(len(buffer), watermark - offset)])
+                    if not read:
+                        return
+                    hashing["hasher"].update(buffer[:read])
+                    hashing["offset"] = offset + read
+                if budget is not None:
+                    budget -= read
+
+    def fetch_segments(self, url, part_path, meta, supports_ranges, progress, meta_path, lock, stop_event, hashing, tap):
+        total = meta["size"]
+        validator = meta["validator"]
+        failed = threading.Event()
+
+        def report_ranges():
+            if tap is not None:
+                with lock:
+                    ranges = [(s["start"], s["start"] + s["done"]) for s in meta["segments"]]
+                tap.update(ranges, total, ranged=supports_ranges)
+
+        def fetch_segment(segment):
+            start = segment["start"] + segment["done"]
+            headers = {"Accept-Encoding": "identity"}
+            if supports_ranges:
+                headers["Range"] = f"bytes={start}-{segment['end']}"
+                if validator:
+                    headers["If-Range"] = validator
+            response = self.http.get(url, stream=True, headers=headers)
+            with response:
+                response.raise_for_status()
+                if supports_ranges:
+                    if response.status_code == 200:
+                        # If-Range failed: the remote file is not the one we started
+                        raise RemoteFileChanged("The remote file changed since the download started")
+                    if response.status_code != 206 or not response.headers.get("Content-Range", "").startswith(f"bytes {start}-"):
+                        raise Exception("Server ignored the requested byte range")
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in self.stream_response(response):
+                        if failed.is_set() or (stop_event and stop_event.is_set()):
+                            return
+                        f.write(chunk)
+                        # The hasher may read this range back through another handle
+                        f.flush()
+                        with hashing["lock"]:
+                            if hashing["offset"] == start:
+                                # This connection is at the hashing frontier, no need to read it back
+                                hashing["hasher"].update(chunk)
+                                hashing["offset"] += len(chunk)
+                        start += len(chunk)
+                        with lock:
+                            segment["done"] += len(chunk)
+
+        report_ranges()
+        pending_segments = [s for s in meta["segments"] if s["end"] is None or s["start"] + s["done"] <= s["end"]]
+        if not pending_segments:
+            return
+        last_saved = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(pending_segments)) as pool:
+            pending = [pool.submit(fetch_segment, segment) for segment in pending_segments]
+            while pending:
+                finished, pending = wait(pending, timeout=self.progress_interval, return_when=FIRST_EXCEPTION)
+                if stop_event and stop_event.is_set():
+                    failed.set()
+                    raise DownloadStopped()
+                for future in finished:
+                    if future.exception():
+                        # Stop the other segments and surface the first error
+                        failed.set()
+                        raise future.exception()
+                # Catch the digest up over bytes written by connections further ahead
+                self.hash_until(part_path, hashing, self.contiguous_done(meta), budget=32 * 1024 * 1024)
+                report_ranges()
+                if progress:
+                    progress(sum(segment["done"] for segment in meta["segments"]), total)
+                if supports_ranges and total and time.monotonic() - last_saved >= 1:
+                    self.save_resume_state(meta_path, meta, lock)
+                    last_saved = time.monotonic()
+
+    def stream_response(self, response):
+        """
+        Yields the body of `response` as memoryviews over a single reusable
+        buffer, so each view is only valid until the next one is requested.
+        The read size doubles while reads complete quickly and halves when they
+        stall, keeping stop requests and progress responsive on slow links.
+        """
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            # The server compressed the body anyway, let requests decode it
+            for chunk in response.iter_content(chunk_size=self.min_chunk_size):
+                if chunk:
+                    yield chunk
+            return
+
+        buffer = memoryview(bytearray(self.max_chunk_size))
+        chunk_size = self.min_chunk_size
+        while True:
+            started = time.monotonic()
+            read = response.raw.readinto(buffer[:chunk_size])
+            if not read:
+                return
+            yield buffer[:read]
+            elapsed = time.monotonic() - started
+            if read == chunk_size and elapsed < 0.05:
+                chunk_size = min(chunk_size * 2, self.max_chunk_size)
+            elif elapsed > 0.25:
+                chunk_size = max(chunk_size // 2, self.min_chunk_size)
@@ -0,0 +1,730 @@
+import hashlib
+import itertools
+import os
+import shutil
+import stat
+import struct
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from downloader import DownloadStopped
+from content_store import remove_file, remove_tree
+
+try:
+    import py7zr
+except ImportError:
+    # .7z support is optional
+    py7zr = None
+
+
+class GrowingFile:
+    """
+    Read-only, seekable view of a file that is still being downloaded.
+
+    The downloader reports which byte ranges of the `.part` file are on disk
+    through update(); reads block until the bytes they need have arrived.
+    Small out-of-band pieces (such as a zip's central directory fetched ahead
+    of time) can be supplied with add_buffer(). The file is reopened for every
+    read, and replace() moves it into place under the same lock, so no handle
+    is ever held across the final rename.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = None
+        self.ranges = []
+        self.buffers = []
+        # Whether the server answers Range requests, so pieces can be fetched ahead of the download
+        self.ranged = True
+        self.complete = False
+        # Sealed: no more bytes will arrive, ranges never fetched are an error to read
+        self.sealed = False
+        self.error = None
+        self.position = 0
+        self.condition = threading.Condition()
+        # Once the file is complete each reading thread keeps its own handle
+        self.local = threading.local()
+        self.handles = []
+
+    # Producer side, called by the downloader
+
+    def update(self, ranges, size, ranged=None):
+        merged = []
+        for start, end in sorted(ranges):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        with self.condition:
+            self.ranges = merged
+            self.size = size
+            if ranged is not None:
+                self.ranged = ranged
+            self.condition.notify_all()
+
+    def replace(self, part_path, path):
+        with self.condition:
+            os.replace(part_path, path)
+            self.path = path
+            if self.size is None:
+                self.size = os.path.getsize(path)
+            self.ranges = [(0, self.size)]
+            self.complete = True
+            self.condition.notify_all()
+
+    def seal(self):
+        with self.condition:
+            self.sealed = True
+            self.condition.notify_all()
+
+    def fail(self, error):
+        with self.condition:
+            self.error = error
+            self.condition.notify_all()
+
+    def add_buffer(self, start, data):
+        with self.condition:
+            self.buffers.append((start, data))
+            self.condition.notify_all()
+
+    # Consumer side
+
+    def available(self, start, end):
+        # Caller holds the condition
+        if self.complete:
+            return True
+        for range_start, range_end in self.ranges:
+            if range_start <= start and end <= range_end:
+                return True
+        return any(buffer_start <= start and end <= buffer_start + len(data) for buffer_start, data in self.buffers)
+
+    def wait_for(self, start, end):
+        with self.condition:
+            while True:
+                if self.error is not None:
+                    raise self.error
+                if self.size is not None:
+                    end = min(end, self.size)
+                if start >= end and (self.complete or self.size is not None) or self.available(start, end):
+                    return
+                if self.sealed:
+                    raise Exception(f"Bytes {start}-{end} of {self.path} were never fetched")
+                self.condition.wait(1)
+
+    def wait_size(self):
+        with self.condition:
+            while self.size is None and not self.complete:
+                if self.error is not None:
+                    raise self.error
+                self.condition.wait(1)
+            return self.size
+
+    def wait_complete(self):
+        with self.condition:
+            while not (self.complete or self.sealed):
+                if self.error is not None:
+                    raise self.error
+                self.condition.wait(1)
+            return self.path
+
+    def readable_end(self, start):
+        # End of the contiguous run of available bytes starting at `start`
+        with self.condition:
+            if self.complete:
+                return self.size
+            for range_start, range_end in self.ranges:
+                if range_start <= start < range_end:
+                    return range_end
+            for buffer_start, data in self.buffers:
+                if buffer_start <= start < buffer_start + len(data):
+                    return buffer_start + len(data)
+        return start
+
+    def read(self, n=-1):
+        # Blocks until `n` bytes (or everything up to the end of the file) have arrived
+        chunks = []
+        wanted = n if n is not None and n >= 0 else None
+        while wanted is None or wanted > 0:
+            self.wait_for(self.position, self.position + 1)
+            end = self.readable_end(self.position)
+            if wanted is not None:
+                end = min(end, self.position + wanted)
+            if end <= self.position:
+                break
+            chunk = self.read_span(self.position, end)
+            chunks.append(chunk)
+            self.position += len(chunk)
+            if wanted is not None:
+                wanted -= len(chunk)
+        return b"".join(chunks)
+
+    def read_span(self, start, end):
+        if self.complete:
+            f = getattr(self.local, "handle", None)
+            if f is None:
+                f = self.local.handle = open(self.path, "rb")
+                with self.condition:
+                    self.handles.append(f)
+            f.seek(start)
+            return f.read(end - start)
+        with self.condition:
+            for buffer_start, data in self.buffers:
+                if buffer_start <= start and end <= buffer_start + len(data):
+                    return data[start - buffer_start:end - buffer_start]
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                return f.read(end - start)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_END:
+            offset += self.wait_size()
+        elif whence == os.SEEK_CUR:
+            offset += self.position
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        with self.condition:
+            for handle in self.handles:
+                handle.close()
+            self.handles = []
+        self.local = threading.local()
+
+    @classmethod
+    def from_file(cls, path):
+        # A file that is already complete, e.g. a locally cached archive
+        source = cls(path)
+        source.size = os.path.getsize(path)
+        source.ranges = [(0, source.size)]
+        source.complete = True
+        return source
+
+
+def sniff(source):
+    """Returns "zip", "tar", "7z" or None from the first bytes of `source`."""
+    source.seek(0)
+    head = source.read(512)
+    while len(head) < 512:
+        chunk = source.read(512 - len(head))
+        if not chunk:
+            break
+        head += chunk
+    source.seek(0)
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return "zip"
+    if head.startswith(b"7z\xbc\xaf\x27\x1c"):
+        return "7z"
+    if head[257:262] == b"ustar" or head.startswith((b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")):
+        # Compressed streams are confirmed to be tarballs when tarfile opens them
+        return "tar"
+    return None
+
+
+def fetch_zip_directory(http, url, source, size, headers=None):
+    """
+    Fetches the end of a remote zip with Range requests and hands the end of
+    central directory record and the central directory to `source` as
+    buffers. Returns the offset where the central directory starts, or None
+    when the server does not serve ranges or the file is not a zip.
+    """
+    headers = {"Accept-Encoding": "identity", **(headers or {})}
+    tail_start = max(0, size - 65536 - 22)
+    # Streamed, so a server ignoring the Range header is hung up on instead of sending the whole file
+    with http.get(url, stream=True, headers={**headers, "Range": f"bytes={tail_start}-"}) as response:
+        if response.status_code != 206:
+            return None
+        tail = response.content
+    source.add_buffer(tail_start, tail)
+    eocd = tail.rfind(b"PK\x05\x06")
+    if eocd < 0 or eocd + 22 > len(tail):
+        return None
+    cd_size, cd_offset = struct.unpack("<II", tail[eocd + 12:eocd + 20])
+    if cd_offset == 0xFFFFFFFF and eocd >= 20 and tail[eocd - 20:eocd - 16] == b"PK\x06\x07":
+        # Zip64: the locator points at the zip64 end record holding the real values
+        record = struct.unpack("<Q", tail[eocd - 12:eocd - 4])[0] - tail_start
+        if 0 <= record and record + 56 <= len(tail) and tail[record:record + 4] == b"PK\x06\x06":
+            cd_size, cd_offset = struct.unpack("<QQ", tail[record + 40:record + 56])
+    if cd_offset == 0xFFFFFFFF:
+        return None
+    if cd_offset < tail_start:
+        end = min(cd_offset + cd_size, tail_start) - 1
+        with http.get(url, stream=True, headers={**headers, "Range": f"bytes={cd_offset}-{end}"}) as response:
+            if response.status_code != 206:
+                return None
+            source.add_buffer(cd_offset, response.content)
+    return cd_offset
+
+
+def safe_path(dest, name):
+    # Refuses absolute paths and anything escaping the install folder
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or os.path.isabs(name) or ":" in parts[0]:
+        return None
+    return os.path.join(dest, *parts)
+
+
+def link_inside(root, path, link):
+    # Whether symlink `path` -> `link` resolves to somewhere inside `root`, `..` included
+    if os.path.isabs(link) or os.path.splitdrive(link)[0] or link.startswith("\\"):
+        return False
+    parts = [part for part in link.replace("\\", "/").split("/") if part not in ("", ".")]
+    climb = len(parts) - len(list(itertools.dropwhile(lambda part: part == "..", parts)))
+    if ".." in parts[climb:]:
+        # "name/.." is only lexically a no-op when name is itself a symlink
+        return False
+    resolved = os.path.normpath(os.path.join(os.path.dirname(path), link))
+    root = os.path.normpath(root)
+    return resolved == root or resolved.startswith(root + os.sep)
+
+
+def common_top_folder(names):
+    # The single folder every member lives in, which gets stripped on install
+    tops = {name.replace("\\", "/").lstrip("/").split("/", 1)[0] for name in names}
+    if len(tops) != 1:
+        return None
+    top = tops.pop()
+    if not all("/" in name.replace("\\", "/").lstrip("/").rstrip("/") or name.rstrip("/\\") == top for name in names):
+        return None
+    return top + "/"
+
+
+def strip_prefix(name, prefix):
+    name = name.replace("\\", "/").lstrip("/")
+    if prefix and name.startswith(prefix):
+        return name[len(prefix):]
+    return name
+
+
+class StreamingExtractor:
+    """
+    Installs an archive while it downloads.
+
+    Tarballs (plain, gz, bz2, xz) are unpacked member by member as the
+    contiguous prefix of the file arrives. For zips the central directory is
+    fetched from the end of the file first; folders are created up front and
+    members are decompressed on a pool of `workers` threads as soon as their
+    byte range is on disk, small members batched together and large ones on
+    their own. .7z archives (with py7zr installed) are unpacked once complete.
+
+    Members are written to a `.extracting` folder inside the destination,
+    keeping Unix permission bits, and progress is reported in uncompressed
+    bytes. Only once the download has been verified is that tree moved over
+    the installed one, with a shared top-level folder stripped; if the archive
+    turns out to be unusable, the download fails verification or the job is
+    paused, the staging folder is dropped and the installed version is left
+    exactly as it was.
+
+    With a ContentStore, file contents go into the store and the tree is
+    made of links to it. A zip member with the CRC-32 and size of a stored
+    object is inflated and hashed, and linked instead of written when its
+    SHA-256 matches. With `trust_crc` (delta updates, where only the changed
+    members were fetched) CRC-32 and size alone are enough, and those members
+    are linked without being decompressed or even waited for. The installed
+    files are merged into the app's manifest, tagged with `asset`, once the
+    install succeeds. `removed` lists files of the version being replaced
+    that are deleted along with the commit.
+    """
+
+    def __init__(self, source, dest, http=None, url=None, progress=None, stop_event=None, workers=None,
+                 large_member_size=1024 * 1024, group_size=4 * 1024 * 1024, store=None, app=None,
+                 asset=None, kind=None, removed=(), trust_crc=False):
+        self.source = source
+        # Archive type when the caller already knows it, e.g. a sparse delta file with no header fetched
+        self.kind = kind
+        self.dest = dest
+        self.staging = os.path.join(dest, ".extracting")
+        self.http = http
+        self.url = url
+        self.progress = progress
+        self.stop_event = stop_event
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.large_member_size = large_member_size
+        self.group_size = group_size
+        self.store = store
+        self.app = app
+        self.asset = asset
+        self.removed = removed
+        self.trust_crc = trust_crc
+        # Relative path -> {"sha256", "size", "crc", "executable", "asset"} for the store manifest
+        self.manifest = {}
+        # The manifest of the version being replaced, files it already has are left alone
+        self.previous = store.manifest(app) if store is not None and app else {}
+        # Folders this install created outside the staging folder, removed on rollback
+        self.written = []
+        self.failed = threading.Event()
+        self.lock = threading.Lock()
+        self.done_bytes = 0
+        self.total_bytes = 0
+
+    def run(self):
+        """Returns "extracted", or None when the file is not an archive."""
+        kind = self.kind or sniff(self.source)
+        if self.store is not None:
+            self.store.begin_install()
+        replaced = False
+        try:
+            if kind:
+                self.begin_staging()
+            root = self.staging
+            if kind == "zip":
+                self.extract_zip()
+            elif kind == "7z":
+                if py7zr is None:
+                    raise Exception("Installing .7z archives needs the py7zr package")
+                root = self.extract_7z()
+            elif kind == "tar":
+                try:
+                    root = self.extract_tar()
+                except tarfile.ReadError:
+                    if os.listdir(self.staging):
+                        raise
+                    # A compressed file that is not a tarball
+                    kind = None
+                    self.rollback()
+            # Only a verified download counts as installed
+            self.source.wait_complete()
+            if kind:
+                self.commit(root)
+            if kind and self.store is not None and self.app:
+                replaced = self.store.save_manifest(self.app, self.manifest, self.removed)
+        except BaseException:
+            self.rollback()
+            raise
+        finally:
+            self.source.close()
+            if self.store is not None:
+                self.store.end_install()
+        if replaced:
+            # Drop whatever only the previous version used
+            self.store.gc()
+        return "extracted" if kind else None
+
+    def check_stopped(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise DownloadStopped()
+        if self.failed.is_set():
+            # Another worker hit an error, which is what gets reported
+            raise DownloadStopped()
+
+    def add_progress(self, count):
+        with self.lock:
+            self.done_bytes += count
+            done = self.done_bytes
+        if self.progress:
+            self.progress(done, self.total_bytes)
+
+    def rollback(self):
+        remove_tree(self.staging, ignore_errors=True)
+        for path in reversed(self.written):
+            # Only folders this install created are listed
+            remove_tree(path, ignore_errors=True)
+        self.written = []
+
+    def make_dirs(self, path):
+        missing = []
+        while path and not os.path.isdir(path):
+            missing.append(path)
+            path = os.path.dirname(path)
+        for folder in reversed(missing):
+            if os.path.lexists(folder):
+                # A file of the previous version where the new one has a folder
+                remove_file(folder)
+            os.makedirs(folder, exist_ok=True)
+            if not folder.startswith(self.staging + os.sep):
+                self.written.append(folder)
+
+    def begin_staging(self):
+        # Left over by an install that was killed outright; the download queue never
+        # runs two jobs for the same app, so it is not another install's
+        remove_tree(self.staging, ignore_errors=True)
+        self.make_dirs(self.staging)
+
+    def commit(self, root):
+        """Moves the staged tree at `root` over the installed one."""
+        if root != self.staging:
+            prefix = os.path.relpath(root, self.staging).replace(os.sep, "/") + "/"
+            self.manifest = {strip_prefix(name, prefix): entry for name, entry in self.manifest.items()}
+        for folder, dirs, files in os.walk(root):
+            target_folder = os.path.normpath(os.path.join(self.dest, os.path.relpath(folder, root)))
+            self.make_dirs(target_folder)
+            links = [name for name in dirs if os.path.islink(os.path.join(folder, name))]
+            dirs[:] = [name for name in dirs if name not in links]
+            for name in files + links:
+                path = os.path.join(folder, name)
+                if os.path.islink(path) and not link_inside(root, path, os.readlink(path)):
+                    # Points outside the app once the top folder is stripped
+                    continue
+                target = os.path.join(target_folder, name)
+                if os.path.isdir(target) and not os.path.islink(target):
+                    remove_tree(target)
+                # Replaces rather than writes through, the old file may be a link into the content store
+                try:
+                    os.replace(os.path.join(folder, name), target)
+                except PermissionError:
+                    # A read-only store link on Windows
+                    remove_file(target)
+                    os.replace(os.path.join(folder, name), target)
+        for name in self.removed:
+            # Files the new version no longer ships
+            path = safe_path(self.dest, name)
+            if name not in self.manifest and path and os.path.lexists(path) and not os.path.isdir(path):
+                remove_file(path)
+        remove_tree(self.staging)
+        self.written = []
+
+    def staged_root(self, names):
+        # The shared top folder of an archive extracted unstripped, if there is one
+        prefix = common_top_folder(names)
+        root = os.path.join(self.staging, prefix.rstrip("/")) if prefix else self.staging
+        # A lone file is not a folder to strip
+        return root if os.path.isdir(root) and not os.path.islink(root) else self.staging
+
+    def relative_path(self, target):
+        # Path inside the staging folder, which is where it ends up inside `dest`
+        return os.path.relpath(target, self.staging).replace(os.sep, "/")
+
+    def write_file(self, target, stream, on_bytes=None, mode=0, crc=None):
+        self.make_dirs(os.path.dirname(target))
+        if os.path.lexists(target):
+            # A tarball can list the same member twice, the last one wins
+            remove_file(target)
+        if self.store is None:
+            with open(target, "wb") as f:
+                self.copy_stream(stream, f, on_bytes)
+            if mode & 0o777:
+                # Keeps executables runnable; the owner can always replace the file on update
+                os.chmod(target, mode & 0o777 | 0o600)
+            return
+        executable = bool(mode & 0o111)
+        f, temp_path = self.store.temp_file()
+        digest = hashlib.sha256()
+        try:
+            with f:
+                size = self.copy_stream(stream, f, on_bytes, digest)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.store.add(temp_path, digest.hexdigest(), executable)
+        self.link_object(target, digest.hexdigest(), size, crc, executable)
+
+    def link_object(self, target, sha256, size, crc, executable):
+        self.store.link(sha256, target, executable)
+        self.manifest[self.relative_path(target)] = {"sha256": sha256, "size": size, "crc": crc, "executable": executable,
+                                                     "asset": self.asset}
+
+    def copy_stream(self, stream, f, on_bytes=None, digest=None):
+        size = 0
+        while True:
+            self.check_stopped()
+            chunk = stream.read(1024 * 1024)
+            if not chunk:
+                return size
+            f.write(chunk)
+            size += len(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            if on_bytes is not None:
+                on_bytes(len(chunk))
+
+    def make_symlink(self, target, link):
+        # Only links that stay inside the install folder, commit() checks again against the final root
+        if not link_inside(self.staging, target, link):
+            return
+        self.make_dirs(os.path.dirname(target))
+        if not os.path.lexists(target):
+            os.symlink(link, target)
+
+    def make_hardlink(self, target, link):
+        # A tar hard link names a member extracted earlier from the same archive
+        source = safe_path(self.staging, link)
+        if source is None or not os.path.isfile(source):
+            raise Exception(f"Hard link {link} points at a file missing from the archive")
+        self.make_dirs(os.path.dirname(target))
+        if os.path.lexists(target):
+            remove_file(target)
+        entry = self.manifest.get(self.relative_path(source)) if self.store is not None else None
+        if entry is not None:
+            self.link_object(target, entry["sha256"], entry["size"], entry["crc"], entry["executable"])
+            return
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def fetch_zip_tail(self):
+        # The end of central directory record and the directory itself, ahead of the download
+        size = self.source.wait_size()
+        if not size or not self.http or not self.url or not self.source.ranged:
+            # Without range support the directory simply arrives at the end of the download
+            return
+        tail_start = max(0, size - 65536 - 22)
+        with self.source.condition:
+            if self.source.available(tail_start, size):
+                return
+        fetch_zip_directory(self.http, self.url, self.source, size)
+
+    def member_end(self, info):
+        # The local header's name/extra lengths can differ from the central directory's.
+        # Read without moving the shared file position, other workers are using it
+        self.source.wait_for(info.header_offset, info.header_offset + 30)
+        header = self.source.read_span(info.header_offset + 26, info.header_offset + 30)
+        name_length, extra_length = struct.unpack("<HH", header)
+        return info.header_offset + 30 + name_length + extra_length + info.compress_size
+
+    def group_members(self, files):
+        # Large members get a worker each; runs of small ones share one to keep per-task overhead down
+        group = []
+        group_bytes = 0
+        for info, target in files:
+            if info.file_size >= self.large_member_size:
+                yield [(info, target)]
+                continue
+            group.append((info, target))
+            group_bytes += info.file_size
+            if group_bytes >= self.group_size or len(group) >= 256:
+                yield group
+                group = []
+                group_bytes = 0
+        if group:
+            yield group
+
+    def extract_zip(self):
+        self.fetch_zip_tail()
+        with zipfile.ZipFile(self.source) as archive:
+            members = sorted(archive.infolist(), key=lambda info: info.header_offset)
+            prefix = common_top_folder([info.filename for info in members])
+            files = []
+            folders = set()
+            for info in members:
+                target = safe_path(self.staging, strip_prefix(info.filename, prefix))
+                if target is None:
+                    continue
+                if info.is_dir():
+                    folders.add(target)
+                else:
+                    files.append((info, target))
+                    folders.add(os.path.dirname(target))
+            # Every folder exists before the workers start writing into them
+            for folder in sorted(folders):
+                self.make_dirs(folder)
+
+            self.total_bytes = sum(info.file_size for info, _ in files)
+            if self.progress:
+                self.progress(0, self.total_bytes)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pending = [pool.submit(self.extract_zip_group, archive, group) for group in self.group_members(files)]
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_EXCEPTION)
+                    for future in finished:
+                        if future.exception():
+                            self.failed.set()
+                            raise future.exception()
+
+    def extract_zip_group(self, archive, group):
+        for info, target in group:
+            self.check_stopped()
+            mode = info.external_attr >> 16 if info.create_system == 3 else 0
+            if self.store is not None and not stat.S_ISLNK(mode):
+                sha256 = self.store.find(info.CRC, info.file_size, bool(mode & 0o111))
+                if sha256 and not self.trust_crc:
+                    # A CRC-32 is easily forged, only the member's own SHA-256 says it is the same content
+                    self.source.wait_for(info.header_offset, self.member_end(info))
+                    if self.hash_member(archive, info) != sha256:
+                        sha256 = None
+                if sha256:
+                    # Content we already have, nothing to write
+                    relative_path = self.relative_path(target)
+                    previous = self.previous.get(relative_path)
+                    if (previous and previous["sha256"] == sha256 and previous.get("executable") == bool(mode & 0o111)
+                            and os.path.exists(os.path.join(self.dest, *relative_path.split("/")))):
+                        # Unchanged since the installed version, nothing to stage
+                        self.manifest[relative_path] = dict(previous, asset=self.asset)
+                        self.add_progress(info.file_size)
+                        continue
+                    self.link_object(target, sha256, info.file_size, info.CRC, bool(mode & 0o111))
+                    self.add_progress(info.file_size)
+                    continue
+            self.source.wait_for(info.header_offset, self.member_end(info))
+            if stat.S_ISLNK(mode):
+                self.make_symlink(target, archive.read(info).decode("utf-8"))
+                self.add_progress(info.file_size)
+                continue
+            with archive.open(info) as member:
+                self.write_file(target, member, on_bytes=self.add_progress, mode=mode, crc=info.CRC)
+
+    def hash_member(self, archive, info):
+        digest = hashlib.sha256()
+        with archive.open(info) as member:
+            while True:
+                self.check_stopped()
+                chunk = member.read(1024 * 1024)
+                if not chunk:
+                    return digest.hexdigest()
+                digest.update(chunk)
+
+    def extract_7z(self):
+        """Returns the folder inside the staging folder that holds the app."""
+        # py7zr needs the whole file, so this waits for the download to finish
+        path = self.source.wait_complete()
+        with py7zr.SevenZipFile(path, "r") as archive:
+            names = archive.getnames()
+            self.total_bytes = sum(entry.uncompressed for entry in archive.list() if not entry.is_directory)
+            if self.progress:
+                self.progress(0, self.total_bytes)
+            archive.extractall(path=self.staging)
+        # 7z has no per-member streaming API to strip the top folder on the way out, commit() does instead
+        root = self.staged_root(names)
+        if self.store is not None:
+            self.store_tree(root)
+        self.add_progress(self.total_bytes)
+        return root
+
+    def store_tree(self, root):
+        # Moves an already extracted tree into the store and puts links in its place
+        for folder, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(folder, name)
+                if os.path.islink(path):
+                    # Only links that stay inside the install folder
+                    if not link_inside(root, path, os.readlink(path)):
+                        os.remove(path)
+                    continue
+                executable = bool(os.stat(path).st_mode & 0o111)
+                size = os.path.getsize(path)
+                self.link_object(path, self.store.add_file(path, executable), size, None, executable)
+
+    def extract_tar(self):
+        """Returns the folder inside the staging folder that holds the app."""
+        self.source.seek(0)
+        names = []
+        with tarfile.open(fileobj=self.source, mode="r|*") as archive:
+            for member in archive:
+                self.check_stopped()
+                target = safe_path(self.staging, member.name)
+                if target is None:
+                    continue
+                names.append(self.relative_path(target))
+                if member.isdir():
+                    self.make_dirs(target)
+                elif member.isfile():
+                    self.write_file(target, archive.extractfile(member), mode=member.mode)
+                elif member.issym():
+                    self.make_symlink(target, member.linkname)
+                elif member.islnk():
+                    self.make_hardlink(target, member.linkname)
+                if self.progress:
+                    self.progress(self.source.tell(), self.source.size or 0)
+        # A shared top folder is only known once every member has been seen, commit() strips it
+        return self.staged_root(names)
@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response built from a cache entry, so call
+    sites can keep using status_code / headers / json().
+    """
+
+    def __init__(self, url, headers, content):
+        self.url = url
+        self.status_code = 200
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    @property
+    def links(self):
+        header = self.headers.get("link")
+        links = {}
+        if header:
+            for link in requests.utils.parse_header_links(header):
+                key = link.get("rel") or link.get("url")
+                links[key] = link
+        return links
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses keyed by URL.
+
+    Entries younger than `ttl` seconds are served without touching the network.
+    Older entries are revalidated with If-None-Match / If-Modified-Since, and a
+    304 reply refreshes the entry instead of re-downloading the body. The least
+    recently used entries are evicted once `max_entries` or `max_bytes` is hit.
+    """
+
+    def __init__(self, path, ttl=300, max_entries=2000, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.db.commit()
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT headers, body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        headers, body, etag, last_modified, stored_at = row
+        return {
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+        }
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        headers = dict(response.headers)
+        body = response.content
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), now, now, len(body))
+            )
+            self.evict()
+            self.db.commit()
+
+    def refresh(self, url, response):
+        # A 304 confirms the stored body; only the validators may have changed
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, response.headers.get("ETag"), response.headers.get("Last-Modified"), url)
+            )
+            self.db.commit()
+
+    def evict(self):
+        # Caller holds the lock; drop least recently used rows until within budget
+        count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self.db.execute("SELECT url, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        stale = []
+        for url, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((url,))
+            count -= 1
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE url = ?", stale)
+
+    def fetch(self, url, getter=requests.get, headers=None):
+        """
+        GET `url` through the cache. Returns either a requests.Response or a
+        CachedResponse; both expose status_code, headers and json().
+        """
+        entry = self.lookup(url)
+        if entry and self.is_fresh(entry):
+            return CachedResponse(url, entry["headers"], entry["body"])
+
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(entry))
+        response = getter(url, headers=request_headers)
+
+        if response.status_code == 304 and entry:
+            self.refresh(url, response)
+            return CachedResponse(url, entry["headers"], entry["body"])
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
@@ -0,0 +1,102 @@
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from http_cache import CachedResponse
+from rate_limit import RateLimitScheduler, RateLimitExceeded, INTERACTIVE
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for every network path in RepoRocket.
+
+    A single requests.Session keeps a keep-alive connection pool per host, so
+    repeated calls to the same API or CDN reuse warm TCP/TLS connections.
+    Idempotent requests are retried with exponential backoff on 5xx replies
+    and dropped connections, and every request gets a connect/read timeout.
+    API requests are metered by a RateLimitScheduler; when a budget is spent,
+    get_cached() serves the last cached copy instead of failing.
+    """
+
+    def __init__(self, cache=None, timeout=(5, 30), retries=3, backoff_factor=0.5,
+                 pool_connections=10, pool_maxsize=16):
+        self.cache = cache
+        self.timeout = timeout
+        self.scheduler = RateLimitScheduler()
+        self.auth_headers = {}
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "RepoRocket"
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # pool_connections is the number of hosts kept warm, pool_maxsize the
+        # connections kept per host (enough for a page of artwork at once)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def set_token(self, host, token):
+        # Personal access tokens raise the API budget; only sent to their own host
+        if token:
+            self.auth_headers[host] = {"Authorization": f"Bearer {token}"}
+        else:
+            self.auth_headers.pop(host, None)
+
+    def has_token(self, host):
+        return host in self.auth_headers
+
+    def get(self, url, priority=INTERACTIVE, **kwargs):
+        return self.request("GET", url, priority, **kwargs)
+
+    def post(self, url, priority=INTERACTIVE, **kwargs):
+        # Not retried on failure, see allowed_methods above
+        return self.request("POST", url, priority, **kwargs)
+
+    def request(self, method, url, priority=INTERACTIVE, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        auth = self.auth_headers.get(urlparse(url).hostname)
+        if auth:
+            kwargs["headers"] = {**auth, **(kwargs.get("headers") or {})}
+
+        bucket = self.scheduler.acquire(url, priority)
+        response = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+        finally:
+            self.scheduler.release(bucket, response)
+
+        if bucket and response.status_code in (403, 429):
+            exhausted, reset_at = self.scheduler.is_exhausted(bucket)
+            if exhausted:
+                raise RateLimitExceeded(bucket, reset_at)
+        return response
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("allow_redirects", True)
+        return self.session.head(url, **kwargs)
+
+    def get_cached(self, url, headers=None, priority=INTERACTIVE):
+        # API lookups go through the response cache when one is configured
+        if self.cache is None:
+            return self.get(url, priority=priority, headers=headers)
+        getter = lambda request_url, **kwargs: self.get(request_url, priority=priority, **kwargs)
+        try:
+            return self.cache.fetch(url, getter=getter, headers=headers)
+        except RateLimitExceeded:
+            # Out of budget: stale data beats an error
+            entry = self.cache.lookup(url)
+            if entry is None:
+                raise
+            return CachedResponse(url, entry["headers"], entry["body"])
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import time
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from workers import Worker
+
+# Columns copied from an app's config.json entry
+CONFIG_FIELDS = ("provider", "repo_id", "release", "executable")
+
+
+class LibraryEventHandler(FileSystemEventHandler):
+    # Runs on the watchdog thread; only hands names over to the Qt side
+    def __init__(self, index, kind):
+        super().__init__()
+        self.index = index
+        self.kind = kind
+
+    def on_any_event(self, event):
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path:
+                self.index.file_event.emit(self.kind, os.path.basename(os.fsdecode(path).rstrip("/\\")))
+
+
+class LibraryIndex(QObject):
+    """
+    SQLite record of every installed app: name, provider, repo id, release,
+    executable, size on disk, artwork key (modification time of its artwork)
+    and last launch.
+
+    The library renders from here instead of listing `applications` on every
+    visit. sync() reconciles the table with the folder once at startup; after
+    that a watchdog observer on `applications` and the artwork folder keeps
+    it current, so apps added, removed or re-skinned outside RepoRocket show
+    up live. The observer only watches the top level of each folder, which
+    keeps it to two watches however many files the apps contain. Events are
+    batched for `debounce_ms` and applied on the GUI thread; sizes are
+    computed on a background thread.
+    """
+
+    # (kind, name) from the watchdog thread, delivered queued to the GUI thread
+    file_event = pyqtSignal(str, str)
+    # The set of apps changed
+    apps_changed = pyqtSignal()
+    # One app's artwork or metadata changed
+    app_changed = pyqtSignal(str)
+
+    def __init__(self, path, apps_dir, artwork_dir, debounce_ms=200, parent=None):
+        super().__init__(parent)
+        self.apps_dir = apps_dir
+        self.artwork_dir = artwork_dir
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS apps (
+                name TEXT PRIMARY KEY,
+                provider TEXT,
+                repo_id TEXT,
+                release TEXT,
+                executable TEXT,
+                size INTEGER,
+                artwork TEXT,
+                installed_at REAL NOT NULL,
+                last_launch REAL
+            )
+        """)
+        self.db.commit()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.pending = {"app": set(), "artwork": set()}
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(debounce_ms)
+        self.flush_timer.timeout.connect(self.flush)
+        self.file_event.connect(self.on_file_event)
+        self.observer = None
+
+    def sync(self, config):
+        """Reconciles the table with the apps folder and config.json."""
+        names = set()
+        if os.path.exists(self.apps_dir):
+            names = {entry.name for entry in os.scandir(self.apps_dir) if entry.is_dir()}
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT name FROM apps")}
+            self.db.executemany("DELETE FROM apps WHERE name = ?", [(name,) for name in known - names])
+            now = time.time()
+            self.db.executemany("INSERT INTO apps (name, installed_at) VALUES (?, ?)", [(name, now) for name in names - known])
+            for name in names:
+                entry = config.get(name, {})
+                self.db.execute(
+                    "UPDATE apps SET provider = ?, repo_id = ?, release = ?, executable = ?, artwork = ? WHERE name = ?",
+                    tuple(str(entry[field]) if entry.get(field) is not None else None for field in CONFIG_FIELDS)
+                    + (self.artwork_key(name), name)
+                )
+            missing_sizes = [row[0] for row in self.db.execute("SELECT name FROM apps WHERE size IS NULL")]
+            self.db.commit()
+        for name in missing_sizes:
+            self.measure(name)
+
+    def start(self):
+        self.observer = Observer()
+        self.observer.schedule(LibraryEventHandler(self, "app"), self.apps_dir, recursive=False)
+        os.makedirs(self.artwork_dir, exist_ok=True)
+        self.observer.schedule(LibraryEventHandler(self, "artwork"), self.artwork_dir, recursive=False)
+        self.observer.daemon = True
+        self.observer.start()
+
+    def close(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(2)
+            self.observer = None
+
+    def artwork_key(self, name):
+        try:
+            return str(os.stat(os.path.join(self.artwork_dir, f"{name}.png")).st_mtime_ns)
+        except OSError:
+            return None
+
+    def apps(self):
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT name FROM apps ORDER BY name COLLATE NOCASE")]
+
+    def artwork_keys(self):
+        # name -> artwork key for every app that has artwork
+        with self.lock:
+            return dict(self.db.execute("SELECT name, artwork FROM apps WHERE artwork IS NOT NULL"))
+
+    def get(self, name):
+        with self.lock:
+            cursor = self.db.execute("SELECT * FROM apps WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row)) if row else None
+
+    def update(self, name, **fields):
+        # Metadata from config.json changes; unknown apps are ignored until their folder appears
+        if not fields:
+            return
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        values = [str(value) if value is not None and field != "size" else value for field, value in fields.items()]
+        with self.lock:
+            self.db.execute(f"UPDATE apps SET {assignments} WHERE name = ?", values + [name])
+            self.db.commit()
+        self.app_changed.emit(name)
+
+    def record_launch(self, name):
+        with self.lock:
+            self.db.execute("UPDATE apps SET last_launch = ? WHERE name = ?", (time.time(), name))
+            self.db.commit()
+
+    def measure(self, name):
+        # Walks the app's folder on the pool, size is filled in when done
+        worker = Worker(self.folder_size, os.path.join(self.apps_dir, name))
+        worker.signals.result.connect(lambda size, name=name: self.update(name, size=size))
+        self.pool.start(worker)
+
+    def folder_size(self, path):
+        total = 0
+        for root, dirs, files in os.walk(path):
+            for file_name in files:
+                try:
+                    total += os.lstat(os.path.join(root, file_name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def refresh(self, name):
+        # Applies a change RepoRocket made itself right away instead of waiting for the watchdog event
+        known = self.get(name) is not None
+        self.pending["app"].add(name)
+        self.flush()
+        if known and os.path.isdir(os.path.join(self.apps_dir, name)):
+            self.measure(name)
+
+    def refresh_artwork(self, name):
+        # Same for artwork RepoRocket saved itself
+        self.pending["artwork"].add(name)
+        self.flush()
+
+    def on_file_event(self, kind, name):
+        if kind == "artwork":
+            if not name.endswith(".png"):
+                return
+            name = name[:-len(".png")]
+        self.pending[kind].add(name)
+        self.flush_timer.start()
+
+    def flush(self):
+        apps, artwork = self.pending["app"], self.pending["artwork"]
+        self.pending = {"app": set(), "artwork": set()}
+        added = []
+        removed = []
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT name FROM apps")}
+            for name in apps:
+                exists = os.path.isdir(os.path.join(self.apps_dir, name))
+                if exists and name not in known:
+                    self.db.execute("INSERT INTO apps (name, artwork, installed_at) VALUES (?, ?, ?)",
+                                    (name, self.artwork_key(name), time.time()))
+                    added.append(name)
+                elif not exists and name in known:
+                    self.db.execute("DELETE FROM apps WHERE name = ?", (name,))
+                    removed.append(name)
+            for name in artwork:
+                self.db.execute("UPDATE apps SET artwork = ? WHERE name = ?", (self.artwork_key(name), name))
+            self.db.commit()
+        for name in added:
+            self.measure(name)
+        if added or removed:
+            self.apps_changed.emit()
+        for name in artwork:
+            self.app_changed.emit(name)
@@ -0,0 +1,183 @@
+import os
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QPersistentModelIndex, QRectF, QSize, QThreadPool
+from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate
+from workers import Worker
+
+# Item data roles beyond Qt's own
+ArtworkPathRole = Qt.ItemDataRole.UserRole + 1
+UpdateRole = Qt.ItemDataRole.UserRole + 2
+# Version of the artwork from the LibraryIndex, None when the app has none
+ArtworkKeyRole = Qt.ItemDataRole.UserRole + 3
+
+TILE_SIZE = QSize(430, 200)  # Aspect ratio 2.14:1
+TILE_RADIUS = 20
+
+
+class LibraryModel(QAbstractListModel):
+    """
+    The installed apps, one row per folder under `applications`.
+
+    Only names and artwork keys are held here; artwork paths and update
+    badges are looked up when the delegate asks for a row, so the model stays
+    a few bytes per app however large the library grows. Painting never has
+    to touch the filesystem.
+    """
+
+    def __init__(self, artwork_dir, parent=None):
+        super().__init__(parent)
+        self.artwork_dir = artwork_dir
+        self.apps = []
+        self.artwork_keys = {}
+        self.updates = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.apps)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        app_name = self.apps[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return app_name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            update = self.updates.get(app_name)
+            return f"{app_name}\nUpdate available: {update['release']}" if update else app_name
+        if role == ArtworkPathRole:
+            return os.path.join(self.artwork_dir, f"{app_name}.png")
+        if role == ArtworkKeyRole:
+            return self.artwork_keys.get(app_name)
+        if role == UpdateRole:
+            update = self.updates.get(app_name)
+            return update["release"] if update else None
+        return None
+
+    def set_apps(self, apps, artwork_keys):
+        if apps == self.apps:
+            if artwork_keys != self.artwork_keys:
+                self.artwork_keys = artwork_keys
+                if self.apps:
+                    self.dataChanged.emit(self.index(0), self.index(len(self.apps) - 1), [ArtworkKeyRole])
+            return
+        self.beginResetModel()
+        self.apps = apps
+        self.artwork_keys = artwork_keys
+        self.endResetModel()
+
+    def set_updates(self, updates):
+        self.updates = updates
+        if self.apps:
+            self.dataChanged.emit(self.index(0), self.index(len(self.apps) - 1), [UpdateRole])
+
+    def app_changed(self, app_name, artwork_key=None):
+        # Repaint one tile, e.g. after its artwork was replaced
+        if artwork_key is None:
+            self.artwork_keys.pop(app_name, None)
+        else:
+            self.artwork_keys[app_name] = artwork_key
+        if app_name in self.apps:
+            index = self.index(self.apps.index(app_name))
+            self.dataChanged.emit(index, index)
+
+
+class LibraryDelegate(QStyledItemDelegate):
+    """
+    Paints library tiles: rounded artwork cropped to fill the tile, or the
+    app name on a plain tile, plus an "Update available" badge.
+
+    Only rows inside the viewport are ever painted. Artwork comes ready-made
+    from a ThumbnailCache, rounded corners included, so painting a tile is a
+    single blit. Tiles not in memory yet are loaded on a small thread pool
+    while a placeholder is shown; loads for tiles scrolled out of view are
+    cancelled by prune().
+    """
+
+    def __init__(self, thumbnails, view, threads=2):
+        super().__init__(view)
+        self.thumbnails = thumbnails
+        self.view = view
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        # Cache key -> (worker, persistent index) for loads in flight
+        self.pending = {}
+        # Cache keys of artwork that could not be read, not retried until the file changes
+        self.failed = set()
+        self.name_font = QFont("Arial")
+        self.name_font.setPixelSize(16)
+        self.badge_font = QFont("Arial")
+        self.badge_font.setPixelSize(13)
+
+    def sizeHint(self, option, index):
+        return TILE_SIZE
+
+    def request(self, key, index, path, size):
+        if key in self.pending:
+            return
+        worker = Worker(self.thumbnails.load, key, path, size)
+        worker.signals.result.connect(lambda image, key=key: self.on_loaded(key, image))
+        worker.signals.error.connect(lambda e, tb, key=key: self.on_loaded(key, None))
+        self.pending[key] = (worker, QPersistentModelIndex(index))
+        self.pool.start(worker)
+
+    def on_loaded(self, key, image):
+        worker, index = self.pending.pop(key, (None, None))
+        if image is None:
+            # Unreadable artwork, the name tile stays
+            self.failed.add(key)
+        else:
+            self.thumbnails.insert(key, image)
+        if index is not None and index.isValid():
+            self.view.update(self.view.model().index(index.row(), 0))
+
+    def prune(self):
+        # Forget queued loads for tiles no longer on screen
+        visible = self.view.viewport().rect()
+        for key, (worker, index) in list(self.pending.items()):
+            if not index.isValid() or not self.view.visualRect(self.view.model().index(index.row(), 0)).intersects(visible):
+                # A cancelled worker that has not started yet returns straight away
+                worker.cancel()
+                del self.pending[key]
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(1, 1, -1, -1)
+        path = QPainterPath()
+        path.addRoundedRect(rect, TILE_RADIUS, TILE_RADIUS)
+
+        highlighted = bool(option.state & (QStyle.StateFlag.State_Selected | QStyle.StateFlag.State_HasFocus))
+        artwork_path = index.data(ArtworkPathRole)
+        size = option.rect.size()
+        key = self.thumbnails.key(artwork_path, index.data(ArtworkKeyRole), size)
+        pixmap = self.thumbnails.find(key) if key else None
+        loading = pixmap is None and key is not None and key not in self.failed
+        if loading:
+            self.request(key, index, artwork_path, size)
+        if pixmap is not None:
+            painter.drawPixmap(option.rect.topLeft(), pixmap)
+        else:
+            hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#3e3e3e" if highlighted or hovered else "#2e2e2e"))
+            painter.drawPath(path)
+            # The name stays dimmed until the artwork replaces it
+            painter.setPen(QColor("#9e9e9e" if loading else "white"))
+            painter.setFont(self.name_font)
+            painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap, index.data())
+
+        if highlighted:
+            painter.setPen(QPen(QColor("white"), 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawPath(path)
+
+        if index.data(UpdateRole):
+            painter.setFont(self.badge_font)
+            text = "Update available"
+            width = painter.fontMetrics().horizontalAdvance(text) + 16
+            badge = QRectF(option.rect.right() - width - 12, option.rect.top() + 12, width, 24)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#2d7d46"))
+            painter.drawRoundedRect(badge, 8, 8)
+            painter.setPen(QColor("white"))
+            painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+# Request priorities, lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, bucket, reset_at):
+        self.bucket = bucket
+        self.reset_at = reset_at
+        super().__init__(f"API rate limit reached for {bucket}, resets at {time.strftime('%H:%M', time.localtime(reset_at))}")
+
+
+class RateLimitScheduler:
+    """
+    Tracks the request budget GitHub and GitLab advertise in their
+    X-RateLimit-* / RateLimit-* headers and hands out request slots per API.
+
+    Waiting requests are served in priority order, so interactive lookups
+    overtake background work. Background requests also stop while the budget
+    is inside the reserve kept for interactive use. Once a budget is spent,
+    acquire() raises RateLimitExceeded until the window resets, so the caller
+    can fall back to cached data instead of burning a failing request.
+
+    Each request reserves one unit of the budget while it is in flight. A
+    reply's own count replaces the local one, since the server knows which
+    requests it charged for, and a 304 without rate-limit headers hands its
+    unit back: conditional requests answered from the cache are free.
+    """
+
+    def __init__(self, max_concurrent=4, background_reserve=0.2):
+        self.max_concurrent = max_concurrent
+        self.background_reserve = background_reserve
+        self.condition = threading.Condition()
+        self.buckets = {}
+        self.waiting = {}
+        self.counter = itertools.count()
+
+    def bucket_for(self, url):
+        # Search, GraphQL and the rest of the GitHub API have separate budgets
+        parsed = urlparse(url)
+        host = parsed.hostname
+        if host == "api.github.com":
+            if parsed.path.startswith("/search"):
+                return "api.github.com/search"
+            if parsed.path.startswith("/graphql"):
+                return "api.github.com/graphql"
+            return host
+        if host == "gitlab.com" and parsed.path.startswith("/api/"):
+            return host
+        return None
+
+    def get_state(self, bucket):
+        state = self.buckets.setdefault(bucket, {"remaining": None, "limit": None, "reset": 0, "active": 0})
+        if state["remaining"] is not None and state["reset"] <= time.time():
+            # The window has rolled over, the next response tells us the new budget
+            state["remaining"] = None
+        return state
+
+    def check_budget(self, bucket, state, priority):
+        if state["remaining"] is None:
+            return
+        if state["remaining"] <= 0:
+            raise RateLimitExceeded(bucket, state["reset"])
+        if priority == BACKGROUND and state["limit"] and state["remaining"] <= state["limit"] * self.background_reserve:
+            raise RateLimitExceeded(bucket, state["reset"])
+
+    def acquire(self, url, priority=INTERACTIVE):
+        bucket = self.bucket_for(url)
+        if bucket is None:
+            return None
+        ticket = (priority, next(self.counter))
+        with self.condition:
+            queue = self.waiting.setdefault(bucket, [])
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    state = self.get_state(bucket)
+                    self.check_budget(bucket, state, priority)
+                    if queue[0] == ticket and state["active"] < self.max_concurrent:
+                        break
+                    self.condition.wait(1)
+            except RateLimitExceeded:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self.condition.notify_all()
+                raise
+            heapq.heappop(queue)
+            state["active"] += 1
+            if state["remaining"] is not None:
+                state["remaining"] -= 1
+            self.condition.notify_all()
+        return bucket
+
+    def release(self, bucket, response=None):
+        if bucket is None:
+            return
+        with self.condition:
+            state = self.get_state(bucket)
+            state["active"] -= 1
+            if response is not None:
+                self.update(state, response)
+            self.condition.notify_all()
+
+    def update(self, state, response):
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining"))
+        limit = headers.get("X-RateLimit-Limit", headers.get("RateLimit-Limit"))
+        reset = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+        if remaining is not None and reset is not None:
+            # Trusted as is, a local count never learns that a 304 went uncharged
+            state["remaining"] = int(remaining)
+            state["reset"] = float(reset)
+            if limit is not None:
+                state["limit"] = int(limit)
+        elif response.status_code == 304 and state["remaining"] is not None:
+            state["remaining"] += 1
+        if response.status_code in (403, 429) and "Retry-After" in headers:
+            try:
+                retry_after = float(headers["Retry-After"])
+            except ValueError:
+                retry_after = 60
+            state["remaining"] = 0
+            state["reset"] = time.time() + retry_after
+
+    def is_exhausted(self, bucket):
+        with self.condition:
+            state = self.get_state(bucket)
+            return state["remaining"] is not None and state["remaining"] <= 0, state["reset"]
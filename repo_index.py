@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class RepoIndex:
+    """
+    Local full-text index of every repository RepoRocket has seen.
+
+    Search results from any provider are upserted as they arrive, together with
+    the latest release tags seen on the details page. Queries are answered from
+    an FTS5 table (falling back to LIKE when SQLite lacks FTS5), so searches work
+    instantly and offline while the remote query refreshes the index. get()
+    gives the library a repo's description and newest releases without a
+    network request.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS repos (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                repo_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                description TEXT NOT NULL,
+                data TEXT NOT NULL,
+                releases TEXT NOT NULL DEFAULT '[]',
+                last_seen REAL NOT NULL,
+                UNIQUE (source, repo_id)
+            )
+        """)
+        try:
+            self.db.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS repos_fts USING fts5(
+                    name, owner, description, content='repos', content_rowid='id'
+                )
+            """)
+            # Keep the external-content FTS table in step with repos
+            self.db.executescript("""
+                CREATE TRIGGER IF NOT EXISTS repos_ai AFTER INSERT ON repos BEGIN
+                    INSERT INTO repos_fts (rowid, name, owner, description)
+                    VALUES (new.id, new.name, new.owner, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS repos_ad AFTER DELETE ON repos BEGIN
+                    INSERT INTO repos_fts (repos_fts, rowid, name, owner, description)
+                    VALUES ('delete', old.id, old.name, old.owner, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS repos_au AFTER UPDATE ON repos BEGIN
+                    INSERT INTO repos_fts (repos_fts, rowid, name, owner, description)
+                    VALUES ('delete', old.id, old.name, old.owner, old.description);
+                    INSERT INTO repos_fts (rowid, name, owner, description)
+                    VALUES (new.id, new.name, new.owner, new.description);
+                END;
+            """)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self.db.commit()
+
+    def add_repos(self, source, rows):
+        # rows: iterable of (repo_id, name, owner, description, repo dict)
+        now = time.time()
+        with self.lock:
+            self.db.executemany("""
+                INSERT INTO repos (source, repo_id, name, owner, description, data, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, repo_id) DO UPDATE SET
+                    name = excluded.name,
+                    owner = excluded.owner,
+                    description = excluded.description,
+                    data = excluded.data,
+                    last_seen = excluded.last_seen
+            """, [(source, str(repo_id), name, owner, description or "", json.dumps(repo), now)
+                  for repo_id, name, owner, description, repo in rows])
+            self.db.commit()
+
+    def record_releases(self, source, repo_id, tags):
+        with self.lock:
+            self.db.execute(
+                "UPDATE repos SET releases = ?, last_seen = ? WHERE source = ? AND repo_id = ?",
+                (json.dumps(list(tags)), time.time(), source, str(repo_id))
+            )
+            self.db.commit()
+
+    def search(self, query, sources=None, limit=50):
+        """Returns [(source, repo dict)] best matches first."""
+        terms = query.lower().split()
+        if not terms:
+            return []
+        source_filter = ""
+        params = []
+        if sources:
+            source_filter = f" AND repos.source IN ({', '.join('?' for _ in sources)})"
+            params.extend(sources)
+
+        with self.lock:
+            if self.fts:
+                # Every term must match as a prefix, close to the substring match used on session results
+                match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+                rows = self.db.execute(
+                    "SELECT repos.source, repos.data FROM repos_fts JOIN repos ON repos.id = repos_fts.rowid "
+                    f"WHERE repos_fts MATCH ?{source_filter} ORDER BY bm25(repos_fts) LIMIT ?",
+                    [match] + params + [limit]
+                ).fetchall()
+            else:
+                conditions = " AND ".join(
+                    "(lower(name) LIKE ? ESCAPE '\\' OR lower(owner) LIKE ? ESCAPE '\\' OR lower(description) LIKE ? ESCAPE '\\')"
+                    for _ in terms
+                )
+                like_params = []
+                for term in terms:
+                    # Typed % and _ are matched literally
+                    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    like_params.extend([f"%{escaped}%"] * 3)
+                rows = self.db.execute(
+                    f"SELECT source, data FROM repos WHERE {conditions}{source_filter} ORDER BY last_seen DESC LIMIT ?",
+                    like_params + params + [limit]
+                ).fetchall()
+        return [(source, json.loads(data)) for source, data in rows]
+
+    def get(self, source, repo_id):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT name, owner, description, data, releases, last_seen FROM repos WHERE source = ? AND repo_id = ?",
+                (source, str(repo_id))
+            ).fetchone()
+        if row is None:
+            return None
+        name, owner, description, data, releases, last_seen = row
+        return {
+            "source": source,
+            "repo_id": str(repo_id),
+            "name": name,
+            "owner": owner,
+            "description": description,
+            "repo": json.loads(data),
+            "releases": json.loads(releases),
+            "last_seen": last_seen,
+        }
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import threading
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QColor, QFont, QImage, QImageReader, QPainter, QPainterPath, QPixmap, QPixmapCache
+
+
+def read_scaled(reader, size, mode=Qt.AspectRatioMode.KeepAspectRatioByExpanding):
+    """
+    Decodes an image straight at the resolution it will be shown at.
+    `reader` is a QImageReader over a file or buffer; formats that can
+    (JPEG) skip most of the full-size decode, the rest are scaled once.
+    Safe off the GUI thread. Returns None for unreadable data.
+    """
+    original = reader.size()
+    if original.isValid() and not original.isEmpty():
+        reader.setScaledSize(original.scaled(size, mode))
+    image = reader.read()
+    return None if image.isNull() else image
+
+
+def placeholder(size, text="", radius=20):
+    # Shown while an image is still on its way
+    pixmap = QPixmap(size)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor("#2e2e2e"))
+    painter.drawRoundedRect(0, 0, size.width(), size.height(), radius, radius)
+    if text:
+        font = QFont("Arial")
+        font.setPixelSize(16)
+        painter.setFont(font)
+        painter.setPen(QColor("#9e9e9e"))
+        painter.drawText(QRect(0, 0, size.width(), size.height()), Qt.AlignmentFlag.AlignCenter, text)
+    painter.end()
+    return pixmap
+
+
+class ThumbnailCache:
+    """
+    Two-level cache of rendered library tiles.
+
+    The first level is QPixmapCache, limited to `memory_bytes`, holding final
+    tile pixmaps. Behind it, `cache_dir` keeps every tile as a PNG that has
+    already been scaled, cropped and given its rounded corners. Entries are
+    keyed by source path, a version of the artwork (its modification time, as
+    recorded by the LibraryIndex) and tile size, so replacing an artwork file
+    or changing the tile size simply misses without the cache ever having to
+    stat the file itself. Only one rendition per artwork and size is kept on
+    disk.
+
+    load() only touches QImage and is safe to call off the GUI thread;
+    find() and insert() deal in QPixmaps and belong on the GUI thread.
+    """
+
+    def __init__(self, cache_dir, memory_bytes=64 * 1024 * 1024, radius=20):
+        self.cache_dir = cache_dir
+        self.radius = radius
+        os.makedirs(cache_dir, exist_ok=True)
+        QPixmapCache.setCacheLimit(memory_bytes // 1024)
+        # disk_prefix() -> renditions on disk, listed once here so a miss never scans the folder
+        self.lock = threading.Lock()
+        self.renditions = {}
+        for name in os.listdir(cache_dir):
+            prefix = os.path.join(cache_dir, name.rsplit("-", 1)[0] + "-")
+            self.renditions.setdefault(prefix, set()).add(os.path.join(cache_dir, name))
+
+    def key(self, path, version, size):
+        # None when there is no artwork
+        if version is None:
+            return None
+        return f"tile:{path}:{version}:{size.width()}x{size.height()}"
+
+    def disk_prefix(self, path, size):
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]}-{size.width()}x{size.height()}-")
+
+    def disk_path(self, key, path, size):
+        return self.disk_prefix(path, size) + key.rsplit(":", 2)[1] + ".png"
+
+    def find(self, key):
+        return QPixmapCache.find(key)
+
+    def insert(self, key, image):
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def load(self, key, path, size):
+        """Returns the tile as a QImage, from disk when rendered before, or None."""
+        tile_path = self.disk_path(key, path, size)
+        image = QImage(tile_path)
+        if not image.isNull():
+            return image
+        image = self.render(path, size)
+        if image is None:
+            return None
+        # Both loader threads can render the same tile, each writes its own temporary file
+        temp_path = f"{tile_path}.{threading.get_ident()}.tmp"
+        image.save(temp_path, "PNG")
+        prefix = self.disk_prefix(path, size)
+        with self.lock:
+            os.replace(temp_path, tile_path)
+            # Drop the rendition of the artwork this replaces
+            stale = self.renditions.get(prefix, set()) - {tile_path}
+            self.renditions[prefix] = {tile_path}
+        for stale_path in stale:
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                pass
+        return image
+
+    def render(self, path, size):
+        scaled = read_scaled(QImageReader(path), size)
+        if scaled is None:
+            return None
+        # Crop the overflow and round the corners, leaving nothing to do at paint time
+        image = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        clip = QPainterPath()
+        clip.addRoundedRect(0, 0, size.width(), size.height(), self.radius, self.radius)
+        painter.setClipPath(clip)
+        painter.drawImage((size.width() - scaled.width()) // 2, (size.height() - scaled.height()) // 2, scaled)
+        painter.end()
+        return image
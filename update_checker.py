@@ -0,0 +1,142 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from checksums import parse_provider_digest
+from rate_limit import BACKGROUND
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+
+class UpdateChecker:
+    """
+    Looks up the newest release of every installed app in one go.
+
+    `installed` maps app names to the origin recorded at install time:
+    {"provider", "repo_id", "repo" ("owner/name" on GitHub), "release",
+    "asset"}. With a GitHub token, all GitHub apps are covered by a single
+    GraphQL query per `batch_size` repos. Everything else is polled
+    concurrently through the response cache, so a release that has not
+    changed costs a 304 (which GitHub does not count against the rate limit)
+    or nothing at all while the cached copy is fresh. All requests go out at
+    BACKGROUND priority and apps that fail to answer are just skipped.
+
+    check() returns {app name: {"release": tag, "assets": [(name, url,
+    digests)]}} for the apps whose newest release differs from the
+    installed one.
+    """
+
+    def __init__(self, http, max_workers=8, batch_size=50):
+        self.http = http
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def check(self, installed):
+        latest = {}
+        pending = dict(installed)
+        if self.http.has_token("api.github.com"):
+            github = {app: origin for app, origin in pending.items() if origin.get("provider") == "GitHub" and origin.get("repo")}
+            names = list(github)
+            for start in range(0, len(names), self.batch_size):
+                batch = {app: github[app] for app in names[start:start + self.batch_size]}
+                try:
+                    latest.update(self.query_github(batch))
+                except Exception:
+                    # Polled one by one below instead
+                    continue
+                for app in batch:
+                    pending.pop(app)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {app: pool.submit(self.fetch_latest, origin) for app, origin in pending.items()}
+            for app, future in futures.items():
+                try:
+                    release = future.result()
+                except Exception:
+                    continue
+                if release:
+                    latest[app] = release
+
+        return {app: release for app, release in latest.items()
+                if release and release["release"] != installed[app].get("release")}
+
+    def fetch_latest(self, origin):
+        # One conditional request per app; None when the provider has no releases to compare
+        provider = origin.get("provider")
+        if provider == "GitHub":
+            response = self.http.get_cached(f"https://api.github.com/repositories/{origin['repo_id']}/releases/latest",
+                                            priority=BACKGROUND)
+            if response.status_code == 404:
+                return None
+            if response.status_code != 200:
+                raise Exception(f"Error checking {origin.get('repo')} for updates")
+            release = response.json()
+            assets = [(asset["name"], asset["browser_download_url"], parse_provider_digest(asset.get("digest")))
+                      for asset in release.get("assets", [])]
+            return {"release": release["tag_name"], "assets": assets}
+        elif provider == "GitLab":
+            response = self.http.get_cached(f"https://gitlab.com/api/v4/projects/{origin['repo_id']}/releases?per_page=1",
+                                            priority=BACKGROUND)
+            if response.status_code != 200:
+                raise Exception(f"Error checking {origin.get('repo_id')} for updates")
+            releases = response.json()
+            if not releases:
+                return None
+            links = releases[0].get("assets", {}).get("links", [])
+            assets = [(link["name"], link.get("direct_asset_url") or link["url"], {}) for link in links]
+            return {"release": releases[0]["tag_name"], "assets": assets}
+        # Internet Archive items are single files without versions
+        return None
+
+    def query_github(self, batch):
+        # One aliased lookup per repo, names passed as variables so nothing needs escaping
+        variables = {}
+        fields = []
+        aliases = {}
+        for index, (app, origin) in enumerate(batch.items()):
+            owner, name = origin["repo"].split("/", 1)
+            variables[f"owner{index}"] = owner
+            variables[f"name{index}"] = name
+            aliases[f"r{index}"] = app
+            fields.append(
+                f"r{index}: repository(owner: $owner{index}, name: $name{index}) {{ latestRelease {{ tagName "
+                f"releaseAssets(first: 100) {{ nodes {{ name downloadUrl }} }} }} }}"
+            )
+        arguments = ", ".join(f"$owner{index}: String!, $name{index}: String!" for index in range(len(batch)))
+        query = f"query({arguments}) {{ {' '.join(fields)} }}"
+        response = self.http.post(GRAPHQL_URL, priority=BACKGROUND, json={"query": query, "variables": variables})
+        if response.status_code != 200:
+            raise Exception("Error checking GitHub for updates")
+        data = response.json().get("data")
+        if data is None:
+            raise Exception("Error checking GitHub for updates")
+
+        latest = {}
+        for alias, app in aliases.items():
+            # A renamed or deleted repo comes back as null next to an error entry
+            release = (data.get(alias) or {}).get("latestRelease")
+            if release:
+                assets = [(asset["name"], asset["downloadUrl"], {}) for asset in release["releaseAssets"]["nodes"]]
+                latest[app] = {"release": release["tagName"], "assets": assets}
+        return latest
+
+
+def match_asset(asset_name, old_release, new_release, names):
+    """
+    Picks the asset of a new release that replaces `asset_name`: the same
+    name, the name with the release tag swapped, or the only asset with the
+    same name once version numbers are ignored.
+    """
+    if asset_name in names:
+        return asset_name
+    if old_release and new_release:
+        for old, new in ((old_release, new_release), (old_release.lstrip("vV"), new_release.lstrip("vV"))):
+            if old and old in asset_name and asset_name.replace(old, new) in names:
+                return asset_name.replace(old, new)
+
+    def skeleton(name):
+        return re.sub(r"\d+", "#", name.lower())
+
+    extension = os.path.splitext(asset_name)[1].lower()
+    candidates = [name for name in names
+                  if skeleton(name) == skeleton(asset_name) and os.path.splitext(name)[1].lower() == extension]
+    return candidates[0] if len(candidates) == 1 else None
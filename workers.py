@@ -0,0 +1,42 @@
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    # Signals live on a QObject so they are delivered back on the GUI thread
+    result = pyqtSignal(object)
+    error = pyqtSignal(object, str)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Run a callable on a QThreadPool and report back through signals.
+    A cancelled worker never emits, so stale results are simply dropped.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(e, traceback.format_exc())
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            if not self.cancelled:
+                self.signals.finished.emit()